@@ -1,8 +1,15 @@
+import time
+_rerun_start = time.perf_counter()
+
 import streamlit as st
 import numpy as np
+import pandas as pd
 from simulation import ProjectileSimulator
+from utils.calculations import coarse_grid, refine_grid, trajectory_metrics
+from utils.plotting import create_animated_trajectory, create_comparison_figure, create_heatmap_figure
 import plotly.graph_objects as go
 from PIL import Image
+from utils.profiling import RerunProfiler
 import os
 
 # ========== PAGE CONFIG ==========
@@ -13,6 +20,17 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# ========== PROFILING ==========
+# ?profile=1 (or PROJECTILE_PROFILE=1) times each phase of the rerun;
+# "memory" and "cprofile" (comma separated, or "all") add tracemalloc
+# peaks and a cProfile dump. Results go to PROJECTILE_PROFILE_DIR.
+profiler = RerunProfiler.from_setting(
+    st.query_params.get("profile", os.environ.get("PROJECTILE_PROFILE", "")),
+    log_dir=os.environ.get("PROJECTILE_PROFILE_DIR", ".profile")
+)
+profiler.record('imports', time.perf_counter() - _rerun_start)
+profiler.phase('layout')
+
 # ========== CUSTOM CSS ==========
 st.markdown("""
 <style>
@@ -176,24 +194,38 @@ g = gravity_map[gravity_mode]
 # Planet Image
 st.sidebar.markdown("### 🪐 Selected Planet")
 planet_name = gravity_mode.split(" ")[0]
-planet_images = {
-    "Earth": "earth.jpg",
-    "Moon": "moon.jpg",
-    "Mars": "mars.jpg",
-    "Jupiter": "jupiter.jpg"
-}
 
-if planet_name in planet_images:
-    image_path = f"assets/{planet_images[planet_name]}"
-    if os.path.exists(image_path):
-        try:
-            planet_img = Image.open(image_path)
-            planet_img.thumbnail((250, 150))
-            st.sidebar.image(planet_img, caption=planet_name)
-        except:
-            st.sidebar.info(f"🌍 {planet_name}")
+@st.cache_resource
+def decode_planet_image(path: str, mtime: float, thumbnail: bool):
+    """Decoded image, cached per file version; raises if it cannot be read"""
+    planet_img = Image.open(path)
+    if thumbnail:
+        planet_img.thumbnail((250, 150))
     else:
-        st.sidebar.info(f"🌍 {planet_name}")
+        planet_img.load()
+    return planet_img
+
+def load_planet_thumbnail(planet: str):
+    """Sidebar thumbnail, or None while no image is available
+    
+    Misses are not cached, so assets built after the server started
+    appear on the next rerun.
+    """
+    thumb_path = f"assets/thumbnails/{planet.lower()}.png"
+    image_path = f"assets/{planet.lower()}.jpg"
+    # Fall back to thumbnailing the full image if the pipeline has not run
+    for path, thumbnail in ((thumb_path, False), (image_path, True)):
+        try:
+            return decode_planet_image(path, os.path.getmtime(path), thumbnail)
+        except Exception:
+            continue
+    return None
+
+planet_img = load_planet_thumbnail(planet_name)
+if planet_img is not None:
+    st.sidebar.image(planet_img, caption=planet_name)
+else:
+    st.sidebar.info(f"🌍 {planet_name}")
 
 # 3. PROJECTILE PROPERTIES
 st.sidebar.markdown("### ⚙️ Projectile Properties")
@@ -201,6 +233,12 @@ mass = st.sidebar.number_input("Mass (kg)", 0.01, 10.0, 0.1, 0.01,
                               help="Mass of the projectile")
 radius = st.sidebar.number_input("Radius (m)", 0.01, 0.5, 0.05, 0.01,
                                 help="Radius of spherical projectile")
+drag_model = st.sidebar.selectbox(
+    "Drag Model",
+    ["Constant Cd (0.47)", "Reynolds-dependent Cd(Re)"],
+    index=0,
+    help="Reynolds-dependent drag captures the drag crisis of a sphere at high speed or size"
+)
 
 # 4. SIMULATION OPTIONS
 st.sidebar.markdown("### ⚡ Simulation Options")
@@ -208,6 +246,18 @@ show_ideal = st.sidebar.checkbox("Show Ideal Trajectory", True,
                                 help="Display theoretical trajectory without drag")
 enable_drag = st.sidebar.checkbox("Enable Air Resistance", True,
                                  help="Include atmospheric drag in simulation")
+integrator = st.sidebar.selectbox(
+    "Integrator",
+    ["Auto (cheapest)", "RK45", "DOP853", "LSODA", "RK4"],
+    index=0,
+    help="Auto picks the cheapest ODE backend that meets the solver tolerance"
+)
+animate = st.sidebar.checkbox("Animate Trajectory", False,
+                              help="Play the flight back in the browser (frames are precomputed once)")
+compare_all = st.sidebar.checkbox("Compare All Environments", False,
+                                  help="Solve the same launch on every planet in one parallel batch")
+show_heatmap = st.sidebar.checkbox("Show Range Explorer", False,
+                                   help="Heatmap of range, height or flight time over all velocities and angles")
 
 # Air density info
 if planet_name in ["Moon", "Mars"]:
@@ -226,108 +276,147 @@ st.sidebar.info("""
 """)
 
 # ========== MAIN CONTENT ==========
-# Initialize simulator
-sim = ProjectileSimulator()
+profiler.phase('simulator setup')
+# Initialize simulator (set PROJECTILE_CACHE_DIR to keep solved trajectories on disk)
+sim = ProjectileSimulator(cache_dir=os.environ.get("PROJECTILE_CACHE_DIR"))
 
 # Set environment
-if 'earth' in planet_name.lower():
-    sim.set_environment('earth')
-elif 'moon' in planet_name.lower():
-    sim.set_environment('moon')
-elif 'mars' in planet_name.lower():
-    sim.set_environment('mars')
-else:
-    sim.set_environment('earth')
+sim.set_environment(planet_name)
+sim.drag_model = 'reynolds' if drag_model.startswith("Reynolds") else 'constant'
+sim.solver_settings['backend'] = 'auto' if integrator.startswith("Auto") else integrator
+
+# Results that do not depend on the planet selection are cached across
+# reruns; arguments starting with _ are left out of the cache key, so the
+# remaining ones must cover every setting the simulator was given
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_comparison(_sim, velocity, angle, mass, radius, drag, drag_model, backend):
+    """Launch solved on every planet, computed once per input combination"""
+    return _sim.compare_environments(velocity, angle, mass, radius, drag=drag)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_grid_level(_sim, level, planet, mass, radius, drag, drag_model):
+    """Range explorer grid after `level` refinements, with all metrics"""
+    def solve(theta, u):
+        return _sim.batch_metrics(u, theta, mass, radius, drag=drag)
+    
+    if level == 0:
+        return coarse_grid(solve)
+    angles, velocities, values, _ = cached_grid_level(_sim, level - 1, planet, mass, radius,
+                                                      drag, drag_model)
+    return refine_grid(solve, angles, velocities, values)
+
+@st.cache_resource
+def finished_grids():
+    """Cells solved per range explorer grid whose final level is cached"""
+    return {}
 
 # Calculate trajectories
 try:
     # Ideal trajectory (no drag)
+    profiler.phase('ideal solve')
     x_ideal, y_ideal = sim.without_air_resistance(velocity, angle, g)
     
     # Realistic trajectory (with drag)
+    profiler.phase('drag solve')
     if enable_drag:
-        t_real, x_real, y_real = sim.with_air_resistance(velocity, angle, mass, radius)
+        drag_result = sim.with_air_resistance(velocity, angle, mass, radius)
+        t_real, x_real, y_real = drag_result
     else:
         # Without drag, use ideal but with same time sampling
         x_real, y_real = x_ideal, y_ideal
         t_real = np.linspace(0, 2*velocity*np.sin(np.radians(angle))/g, len(x_real))
     
     # ========== VISUALIZATION ==========
+    profiler.phase('figure build')
     col1, col2 = st.columns([7, 3])
     
     with col1:
-        # Create Plotly figure
-        fig = go.Figure()
+        if animate:
+            # All frames are precomputed here; playback runs client-side
+            frames = sim.trajectory_frames(velocity, angle, mass, radius,
+                                           n_frames=60, drag=enable_drag,
+                                           result=drag_result if enable_drag else None)
+            fig = create_animated_trajectory(
+                *frames, planet_name, show_ideal=show_ideal,
+                drag_label='Realistic (With Drag)' if enable_drag else 'Trajectory'
+            )
+            profiler.phase('plotly serialization')
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            # Create Plotly figure
+            fig = go.Figure()
         
-        # Add ideal trajectory
-        if show_ideal and len(x_ideal) > 0:
-            fig.add_trace(go.Scatter(
-                x=x_ideal, y=y_ideal,
-                mode='lines',
-                name='Ideal (No Drag)',
-                line=dict(color='#3B82F6', dash='dash', width=2),
-                hovertemplate='<b>Ideal Trajectory</b><br>Distance: %{x:.1f} m<br>Height: %{y:.1f} m<extra></extra>'
-            ))
+            # Add ideal trajectory
+            if show_ideal and len(x_ideal) > 0:
+                fig.add_trace(go.Scatter(
+                    x=x_ideal, y=y_ideal,
+                    mode='lines',
+                    name='Ideal (No Drag)',
+                    line=dict(color='#3B82F6', dash='dash', width=2),
+                    hovertemplate='<b>Ideal Trajectory</b><br>Distance: %{x:.1f} m<br>Height: %{y:.1f} m<extra></extra>'
+                ))
         
-        # Add realistic trajectory
-        if len(x_real) > 0:
+            # Add realistic trajectory
+            if len(x_real) > 0:
+                fig.add_trace(go.Scatter(
+                    x=x_real, y=y_real,
+                    mode='lines',
+                    name='Realistic (With Drag)' if enable_drag else 'Trajectory',
+                    line=dict(color='#EF4444', width=3),
+                    hovertemplate='<b>Realistic Trajectory</b><br>Distance: %{x:.1f} m<br>Height: %{y:.1f} m<extra></extra>'
+                ))
+        
+            # Add launch point
             fig.add_trace(go.Scatter(
-                x=x_real, y=y_real,
-                mode='lines',
-                name='Realistic (With Drag)' if enable_drag else 'Trajectory',
-                line=dict(color='#EF4444', width=3),
-                hovertemplate='<b>Realistic Trajectory</b><br>Distance: %{x:.1f} m<br>Height: %{y:.1f} m<extra></extra>'
+                x=[0], y=[0],
+                mode='markers',
+                name='Launch Point',
+                marker=dict(size=12, color='#10B981', symbol='circle'),
+                hovertemplate='<b>Launch Point</b><br>(0, 0)<extra></extra>'
             ))
         
-        # Add launch point
-        fig.add_trace(go.Scatter(
-            x=[0], y=[0],
-            mode='markers',
-            name='Launch Point',
-            marker=dict(size=12, color='#10B981', symbol='circle'),
-            hovertemplate='<b>Launch Point</b><br>(0, 0)<extra></extra>'
-        ))
-        
-        # Update layout with CORRECT properties
-        fig.update_layout(
-            title=dict(
-                text=f"Projectile Trajectory on {planet_name}",
-                font=dict(size=24, color='#1F2937'),
-                x=0.5,
-                xanchor='center'
-            ),
-            xaxis=dict(
-                title="Horizontal Distance (m)",
-                title_font=dict(size=14),  # CORRECTED: title_font instead of titlefont
-                gridcolor='#E5E7EB',
-                zerolinecolor='#E5E7EB'
-            ),
-            yaxis=dict(
-                title="Vertical Height (m)",
-                title_font=dict(size=14),  # CORRECTED: title_font instead of titlefont
-                gridcolor='#E5E7EB',
-                zerolinecolor='#E5E7EB'
-            ),
-            hovermode='x unified',
-            height=550,
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            legend=dict(
-                yanchor="top",
-                y=0.99,
-                xanchor="left",
-                x=0.02,
-                bgcolor='rgba(255, 255, 255, 0.9)',
-                bordercolor='#E5E7EB',
-                borderwidth=1
-            ),
-            margin=dict(l=50, r=30, t=80, b=50)
-        )
+            # Update layout with CORRECT properties
+            fig.update_layout(
+                title=dict(
+                    text=f"Projectile Trajectory on {planet_name}",
+                    font=dict(size=24, color='#1F2937'),
+                    x=0.5,
+                    xanchor='center'
+                ),
+                xaxis=dict(
+                    title="Horizontal Distance (m)",
+                    title_font=dict(size=14),  # CORRECTED: title_font instead of titlefont
+                    gridcolor='#E5E7EB',
+                    zerolinecolor='#E5E7EB'
+                ),
+                yaxis=dict(
+                    title="Vertical Height (m)",
+                    title_font=dict(size=14),  # CORRECTED: title_font instead of titlefont
+                    gridcolor='#E5E7EB',
+                    zerolinecolor='#E5E7EB'
+                ),
+                hovermode='x unified',
+                height=550,
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                legend=dict(
+                    yanchor="top",
+                    y=0.99,
+                    xanchor="left",
+                    x=0.02,
+                    bgcolor='rgba(255, 255, 255, 0.9)',
+                    bordercolor='#E5E7EB',
+                    borderwidth=1
+                ),
+                margin=dict(l=50, r=30, t=80, b=50)
+            )
         
-        st.plotly_chart(fig, use_container_width=True)
+            profiler.phase('plotly serialization')
+            st.plotly_chart(fig, use_container_width=True)
     
     with col2:
         # ========== PERFORMANCE METRICS ==========
+        profiler.phase('metrics')
         st.markdown("### 📊 Performance Metrics")
         
         if len(x_ideal) > 0 and len(x_real) > 0:
@@ -413,7 +502,72 @@ try:
             else:
                 st.info("📐 **Angle Note**: Above optimal 45° for maximum range")
     
+    # ========== ENVIRONMENT COMPARISON ==========
+    if compare_all:
+        profiler.phase('comparison')
+        st.markdown("---")
+        st.markdown("### 🪐 Environment Comparison")
+        
+        comparison = cached_comparison(sim, velocity, angle, mass, radius, enable_drag,
+                                       sim.drag_model, sim.solver_settings['backend'])
+        
+        col_fig, col_table = st.columns([7, 3])
+        with col_fig:
+            st.plotly_chart(create_comparison_figure(comparison), use_container_width=True)
+        with col_table:
+            rows = []
+            for env, (t_env, x_env, y_env) in comparison.items():
+                metrics = trajectory_metrics(t_env, x_env, y_env)
+                rows.append({
+                    'Planet': env.title(),
+                    'Range (m)': round(metrics['range'], 1),
+                    'Max Height (m)': round(metrics['max_height'], 1),
+                    'Flight Time (s)': round(metrics['flight_time'], 2),
+                })
+            st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+    
+    # ========== RANGE EXPLORER ==========
+    if show_heatmap:
+        profiler.phase('range explorer')
+        st.markdown("---")
+        st.markdown("### 🗺️ Range Explorer")
+        
+        heatmap_metrics = {
+            "Range (m)": 'range',
+            "Maximum Height (m)": 'max_height',
+            "Time of Flight (s)": 'flight_time',
+        }
+        metric_label = st.selectbox("Metric", list(heatmap_metrics), index=0)
+        metric_key = heatmap_metrics[metric_label]
+        
+        # On a cache miss the coarse grid renders first, then the
+        # placeholder is redrawn as the grid is refined where the metrics
+        # change quickly. Levels are cached per planet and projectile, so
+        # launch sliders and the metric choice only redraw the final level
+        heatmap_slot = st.empty()
+        heatmap_caption = st.empty()
+        grid_key = (planet_name, mass, radius, enable_drag, sim.drag_model)
+        cached_total = finished_grids().get(grid_key)
+        total_solved = 0
+        for level in (range(4) if cached_total is None else [3]):
+            grid_angles, grid_velocities, grid_values, n_solved = cached_grid_level(
+                sim, level, planet_name, mass, radius, enable_drag, sim.drag_model)
+            grid_values = grid_values[metric_key]
+            total_solved = cached_total if cached_total is not None else total_solved + n_solved
+            heatmap_slot.plotly_chart(
+                create_heatmap_figure(grid_angles, grid_velocities, grid_values,
+                                      metric_label, velocity, angle),
+                use_container_width=True,
+                key=f"range_heatmap_{level}"
+            )
+            heatmap_caption.caption(
+                f"Grid {len(grid_angles)} × {len(grid_velocities)} · "
+                f"{total_solved} of {grid_values.size} cells solved exactly"
+            )
+        finished_grids()[grid_key] = total_solved
+    
     # ========== PHYSICS ANALYSIS SECTION ==========
+    profiler.phase('layout')
     st.markdown("---")
     st.markdown("### 🔬 Physics Analysis")
     
@@ -460,7 +614,14 @@ try:
             - Planet: {}
             - Gravity: {:.2f} m/s²
             - Air Density: {:.3f} kg/m³
-            """.format(mass, radius, np.pi * radius**2, planet_name, g, sim.rho))
+            
+            **Drag at Launch:**
+            - Reynolds Number: {:.2e}
+            - Drag Coefficient: {}
+            """.format(mass, radius, np.pi * radius**2, planet_name, g, sim.rho,
+                       sim.reynolds_number(velocity, radius),
+                       "{:.3f}".format(float(sim.drag_coefficient(velocity, radius)))
+                       if sim.rho > 0.001 else "n/a (no atmosphere)"))
             st.markdown('</div>', unsafe_allow_html=True)
     
     with tab2:
@@ -572,8 +733,8 @@ try:
     st.sidebar.markdown("---")
     
     # Export Data
+    profiler.phase('export')
     if st.sidebar.button("💾 Export Simulation Data", use_container_width=True):
-        import pandas as pd
         if len(x_real) > 0:
             df = pd.DataFrame({
                 'Time': t_real,
@@ -609,4 +770,27 @@ except Exception as e:
 if 'x_ideal' in locals() and 'x_real' in locals():
     if len(x_ideal) > 0 and len(x_real) > 0:
         #st.balloons()
-        st.success("✅ Simulation complete! Explore different parameters to see how they affect the trajectory.")
\ No newline at end of file
+        st.success("✅ Simulation complete! Explore different parameters to see how they affect the trajectory.")
+
+# ========== PROFILING PANEL ==========
+if profiler.enabled:
+    profile_report = profiler.finish(
+        velocity=velocity, angle=angle, planet=planet_name, mass=mass, radius=radius,
+        drag=enable_drag, drag_model=drag_model, integrator=integrator,
+        animate=animate, compare_all=compare_all, show_heatmap=show_heatmap
+    )
+    with st.expander(f"⏱️ Rerun Profile ({profile_report['total_ms']:.0f} ms)"):
+        phases = pd.DataFrame(profile_report['phases'])
+        phases['share'] = (100 * phases['share']).round(1)
+        st.dataframe(
+            phases.rename(columns={'phase': 'Phase', 'time_ms': 'Time (ms)', 'share': 'Share (%)',
+                                   'process_peak_kb': 'Process Peak Memory (KiB)'}).round(1),
+            hide_index=True, use_container_width=True
+        )
+        if 'skipped' in profile_report:
+            st.caption(f"Skipped while another rerun holds them: {', '.join(profile_report['skipped'])}")
+        if 'cprofile_top' in profile_report:
+            st.code(profile_report['cprofile_top'], language=None)
+        st.caption(f"Logged to {os.path.join(profiler.log_dir, 'rerun_profile.log')}"
+                   + (f" · cProfile dump: {profile_report['cprofile_dump']}"
+                      if 'cprofile_dump' in profile_report else ""))
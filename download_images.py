@@ -1,65 +1,194 @@
 # download_images.py
-import requests
+import argparse
+import hashlib
+import io
+import json
 import os
-from PIL import Image  # For resizing if needed
-
-# Create assets directory if it doesn't exist
-os.makedirs('assets', exist_ok=True)
-
-# CORRECTED NASA Earth image URL
-earth_url = "https://eoimages.gsfc.nasa.gov/images/imagerecords/57000/57730/land_shallow_topo_2048.jpg"
-
-try:
-    print("🌍 Downloading Earth image from NASA...")
-    earth_response = requests.get(earth_url, timeout=10)
-    earth_response.raise_for_status()  # Check for HTTP errors
-    
-    with open('assets/earth.jpg', 'wb') as f:
-        f.write(earth_response.content)
-    print("✅ Earth image downloaded successfully!")
-    
-except requests.exceptions.RequestException as e:
-    print(f"❌ Error downloading Earth image: {e}")
-    print("⚠️ Using fallback image or skipping Earth image...")
-
-# NASA Moon image
-moon_url = "https://moon.nasa.gov/system/resources/gltf_webp/444/444_Moon_New_4K.jpg"
-
-try:
-    print("🌙 Downloading Moon image from NASA...")
-    moon_response = requests.get(moon_url, timeout=10)
-    moon_response.raise_for_status()
-    
-    with open('assets/moon.jpg', 'wb') as f:
-        f.write(moon_response.content)
-    print("✅ Moon image downloaded successfully!")
-    
-except requests.exceptions.RequestException as e:
-    print(f"❌ Error downloading Moon image: {e}")
-    print("⚠️ Using fallback image or skipping Moon image...")
-
-# Optional: Resize images if they're too large
-print("\n🔄 Optimizing images for the project...")
-try:
-    # Resize Earth image (optional)
-    earth_img = Image.open('assets/earth.jpg')
-    if earth_img.size[0] > 800:  # If width > 800px
-        earth_img = earth_img.resize((800, 400))
-        earth_img.save('assets/earth.jpg')
-        print("✅ Earth image resized to 800x400")
-    
-    # Resize Moon image (optional)
-    moon_img = Image.open('assets/moon.jpg')
-    if moon_img.size[0] > 800:
-        moon_img = moon_img.resize((800, 400))
-        moon_img.save('assets/moon.jpg')
-        print("✅ Moon image resized to 800x400")
-        
-except Exception as e:
-    print(f"⚠️ Could not resize images: {e}")
-
-print("\n🎉 Image setup complete!")
-print("Assets created in: ./assets/")
-print("\nFiles:")
-for file in os.listdir('assets'):
-    print(f"  - {file}")
\ No newline at end of file
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from PIL import Image, ImageDraw
+
+ASSET_DIR = 'assets'
+MANIFEST_FILE = 'manifest.json'
+
+FULL_SIZE = (800, 400)   # Bounding box for the stored full image
+THUMB_SIZE = (250, 150)  # Bounding box for the sidebar thumbnail
+
+# NASA image sources (None = no remote source, a placeholder is drawn)
+PLANET_URLS = {
+    'earth': "https://eoimages.gsfc.nasa.gov/images/imagerecords/57000/57730/land_shallow_topo_2048.jpg",
+    'moon': "https://moon.nasa.gov/system/resources/gltf_webp/444/444_Moon_New_4K.jpg",
+    'mars': None,
+    'jupiter': None,
+}
+
+# Disc colours for placeholder thumbnails
+PLACEHOLDER_COLORS = {
+    'earth': (59, 130, 246),
+    'moon': (156, 163, 175),
+    'mars': (193, 68, 14),
+    'jupiter': (216, 168, 110),
+}
+
+
+class UrlSource:
+    """Fetch planet images over HTTP"""
+
+    def __init__(self, urls: dict = None, timeout: float = 10):
+        self.urls = PLANET_URLS if urls is None else urls
+        self.timeout = timeout
+
+    def fetch(self, planet: str):
+        url = self.urls.get(planet)
+        if url is None:
+            return None
+        response = requests.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.content
+
+
+class LocalSource:
+    """Read planet images from a local directory (offline use and tests)"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def fetch(self, planet: str):
+        path = os.path.join(self.directory, f"{planet}.jpg")
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+
+
+def _placeholder_thumbnail(planet: str) -> Image.Image:
+    """Plain disc in the planet's colour, used when no image is available"""
+    img = Image.new('RGBA', THUMB_SIZE, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    size = min(THUMB_SIZE) - 10
+    left = (THUMB_SIZE[0] - size) // 2
+    top = (THUMB_SIZE[1] - size) // 2
+    draw.ellipse((left, top, left + size, top + size),
+                 fill=PLACEHOLDER_COLORS.get(planet, (107, 114, 128)))
+    return img
+
+
+def _manifest_entry(value):
+    """Manifest entry as a dict (older manifests stored the bare digest)"""
+    if isinstance(value, str):
+        return {'sha256': value, 'decoded': True}
+    return value
+
+
+def process_asset(planet: str, source, known: dict = None,
+                  asset_dir: str = ASSET_DIR) -> tuple:
+    """Fetch, resize and thumbnail one planet image
+
+    known is the planet's manifest entry from the previous run. Returns
+    (planet, status, entry) where status is one of 'updated', 'unchanged',
+    'placeholder', 'kept' or 'failed', and entry is the new manifest
+    entry (None to drop it).
+    """
+    full_path = os.path.join(asset_dir, f"{planet}.jpg")
+    thumb_path = os.path.join(asset_dir, 'thumbnails', f"{planet}.png")
+    known = known or {}
+
+    try:
+        data = source.fetch(planet)
+    except Exception as e:
+        print(f"❌ Error fetching {planet} image: {e}")
+        data = None
+
+    if data is None:
+        if os.path.exists(thumb_path):
+            return planet, 'kept', known or None
+        _placeholder_thumbnail(planet).save(thumb_path)
+        return planet, 'placeholder', None
+
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == known.get('sha256') and os.path.exists(thumb_path):
+        if not known.get('decoded', True):
+            # Same bytes that failed to decode last time
+            return planet, 'failed', known
+        if os.path.exists(full_path):
+            return planet, 'unchanged', known
+
+    try:
+        img = Image.open(io.BytesIO(data)).convert('RGB')
+        img.thumbnail(FULL_SIZE)
+        img.save(full_path, quality=90)
+
+        img.thumbnail(THUMB_SIZE)
+        img.save(thumb_path)
+    except Exception as e:
+        print(f"⚠️ Could not process {planet} image: {e}")
+        if not os.path.exists(thumb_path):
+            _placeholder_thumbnail(planet).save(thumb_path)
+        return planet, 'failed', {'sha256': digest, 'decoded': False}
+
+    return planet, 'updated', {'sha256': digest, 'decoded': True}
+
+
+def build_assets(source, asset_dir: str = ASSET_DIR, planets=None,
+                 max_workers: int = 4) -> dict:
+    """Fetch and process all planet images concurrently
+
+    Content hashes are kept in a manifest so unchanged images, and
+    images already known not to decode, are not processed again.
+    Returns {planet: status}.
+    """
+    planets = list(PLANET_URLS) if planets is None else list(planets)
+    os.makedirs(os.path.join(asset_dir, 'thumbnails'), exist_ok=True)
+
+    manifest_path = os.path.join(asset_dir, MANIFEST_FILE)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path) as f:
+                manifest = {planet: _manifest_entry(value)
+                            for planet, value in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            manifest = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(
+            lambda planet: process_asset(planet, source, manifest.get(planet), asset_dir),
+            planets
+        ))
+
+    statuses = {}
+    for planet, status, entry in results:
+        statuses[planet] = status
+        if entry is None:
+            manifest.pop(planet, None)
+        else:
+            manifest[planet] = entry
+
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch planet images and build thumbnails")
+    parser.add_argument('--local', metavar='DIR',
+                        help="read images from DIR instead of downloading (e.g. assests)")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="number of concurrent fetches")
+    args = parser.parse_args()
+
+    source = LocalSource(args.local) if args.local else UrlSource()
+
+    print("🌍 Building planet assets...")
+    statuses = build_assets(source, max_workers=args.workers)
+    for planet, status in statuses.items():
+        print(f"  - {planet}: {status}")
+
+    print("\n🎉 Image setup complete!")
+    print(f"Assets created in: ./{ASSET_DIR}/")
+
+
+if __name__ == "__main__":
+    main()
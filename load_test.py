@@ -0,0 +1,269 @@
+# load_test.py
+"""Multi-session load test for app.py
+
+Drives N simulated users through app.py with Streamlit's AppTest, each in
+its own thread of one process (like sessions on a single Streamlit
+server, sharing its caches), and reports rerun latency percentiles, CPU
+time per rerun and the process's memory growth. No server or external
+services are needed.
+
+AppTest cannot run two scripts at once, so the sessions interleave but
+their reruns are serialized: latency is queue wait plus service time,
+and with several sessions its p95/p99 mostly measure the queue. Service
+time is the rerun alone. Memory is only measured for the whole process;
+the per-session figure is that growth divided by the session count, an
+average rather than any one session's footprint. RSS comes from the
+resource module, which Windows lacks; there only the Python heap figures
+from tracemalloc are reported.
+
+    python load_test.py --sessions 8 --iterations 2
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+from streamlit.logger import set_log_level
+from streamlit.testing.v1 import AppTest
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+GRAVITY_OPTIONS = ["Earth (9.81 m/s²)", "Moon (1.62 m/s²)",
+                   "Mars (3.71 m/s²)", "Jupiter (24.79 m/s²)"]
+
+
+def _widget(at, kind: str, label: str):
+    """Find a widget of the given kind (slider, selectbox, ...) by label"""
+    for widget in getattr(at, kind):
+        if widget.label == label:
+            return widget
+    raise LookupError(f"No {kind} labelled {label!r}")
+
+
+def interaction_script(rng: random.Random) -> list:
+    """One user's sequence of (action kind, callable(at)) steps
+
+    Each callable changes widget state; the harness then times the rerun.
+    """
+    steps = [('initial', lambda at: None)]
+
+    # Slider drags: a few intermediate values on the way to the target,
+    # as Streamlit reruns on every release
+    for label, low, high in (("Velocity (m/s)", 10, 100), ("Angle (°)", 15, 75)):
+        start = rng.randint(low, high)
+        for value in np.linspace(start, rng.randint(low, high), 3).round().astype(int):
+            steps.append(('slider', lambda at, label=label, value=int(value):
+                          _widget(at, 'slider', label).set_value(value)))
+
+    # Planet switches
+    for planet in rng.sample(GRAVITY_OPTIONS, k=len(GRAVITY_OPTIONS)):
+        steps.append(('planet', lambda at, planet=planet:
+                      _widget(at, 'selectbox', "Gravity Setting").select(planet)))
+
+    # Projectile properties
+    steps.append(('property', lambda at, mass=round(rng.uniform(0.05, 2.0), 2):
+                  _widget(at, 'number_input', "Mass (kg)").set_value(mass)))
+    steps.append(('property', lambda at, radius=round(rng.uniform(0.02, 0.3), 2):
+                  _widget(at, 'number_input', "Radius (m)").set_value(radius)))
+
+    # Optional views, switched on and off again
+    for label in rng.sample(["Animate Trajectory", "Compare All Environments",
+                             "Show Range Explorer"], k=2):
+        steps.append(('view', lambda at, label=label: _widget(at, 'checkbox', label).check()))
+        steps.append(('view', lambda at, label=label: _widget(at, 'checkbox', label).uncheck()))
+
+    # Export
+    steps.append(('export', lambda at: _widget(at, 'button', "💾 Export Simulation Data").click()))
+
+    return steps
+
+
+# AppTest swaps a process-wide mock Runtime in and out around each run,
+# so runs cannot overlap; sessions queue on this lock the way script
+# threads share one interpreter on a real server, and the wait counts
+# towards the latency users see
+_run_lock = threading.Lock()
+
+
+def run_session(app_path: str, seed: int, iterations: int, timeout: float,
+                think_time: float, records: list, errors: list,
+                lock: threading.Lock) -> None:
+    """Run one simulated user and append (kind, latency, service) records
+
+    latency counts from the rerun being requested, so it includes the wait
+    for _run_lock; service counts from the rerun starting.
+    """
+    rng = random.Random(seed)
+    at = AppTest.from_file(app_path, default_timeout=timeout)
+    for _ in range(iterations):
+        for kind, action in interaction_script(rng):
+            if think_time > 0:
+                time.sleep(rng.uniform(0, 2 * think_time))
+            try:
+                action(at)
+                requested = time.perf_counter()
+                with _run_lock:
+                    started = time.perf_counter()
+                    at.run()
+                finished = time.perf_counter()
+            except Exception as e:
+                with lock:
+                    errors.append(f"session {seed} {kind}: {e}")
+                continue
+            with lock:
+                records.append((kind, finished - requested, finished - started))
+                # The app reports failures with st.error as well as raising
+                for element in list(at.exception) + list(at.error):
+                    errors.append(f"session {seed} {kind}: {element.value}")
+
+
+def _rss_mb():
+    """Peak resident set size of this process in MB, None where unavailable"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return rss / 1024**2 if sys.platform == 'darwin' else rss / 1024
+
+
+def _percentiles(latencies) -> dict:
+    values = np.asarray(latencies) * 1000
+    return {
+        'count': int(len(values)),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'max_ms': float(np.max(values)),
+    }
+
+
+def run_load_test(app_path: str = 'app.py', sessions: int = 4, iterations: int = 1,
+                  seed: int = 0, timeout: float = 120, think_time: float = 0.0,
+                  trace_memory: bool = True) -> dict:
+    """Run all sessions concurrently and summarise the measurements"""
+    records, errors = [], []
+    lock = threading.Lock()
+
+    # One untimed run first, so initial runs are measured on a warm process
+    # rather than paying for the app's imports
+    AppTest.from_file(app_path, default_timeout=timeout).run()
+
+    if trace_memory:
+        tracemalloc.start()
+    rss_before = _rss_mb()
+    cpu_before = time.process_time()
+    wall_before = time.perf_counter()
+
+    threads = [
+        threading.Thread(target=run_session,
+                         args=(app_path, seed + i, iterations, timeout, think_time,
+                               records, errors, lock))
+        for i in range(sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    wall = time.perf_counter() - wall_before
+    cpu = time.process_time() - cpu_before
+    rss_after = _rss_mb()
+    rss_growth = rss_after - rss_before if rss_after is not None else None
+    traced = None
+    if trace_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        traced = {'current_mb': current / 1024**2, 'peak_mb': peak / 1024**2}
+
+    reruns = len(records)
+    summary = {
+        'sessions': sessions,
+        'iterations': iterations,
+        'reruns': reruns,
+        'errors': errors,
+        'wall_s': wall,
+        'cpu_s': cpu,
+        'cpu_per_rerun_ms': 1000 * cpu / reruns if reruns else None,
+        # Process-wide; the per-session value is an average, not a measurement
+        'process_peak_rss_growth_mb': rss_growth,
+        'avg_rss_growth_per_session_mb': rss_growth / sessions if rss_growth is not None else None,
+        'traced_memory': traced,
+        'latency': _percentiles([latency for _, latency, _ in records]) if records else None,
+        'service': _percentiles([service for _, _, service in records]) if records else None,
+        'queue_wait': _percentiles([latency - service for _, latency, service in records]) if records else None,
+        'latency_by_kind': {
+            kind: _percentiles([latency for k, latency, _ in records if k == kind])
+            for kind in sorted({k for k, _, _ in records})
+        },
+    }
+    return summary
+
+
+def print_summary(summary: dict) -> None:
+    print(f"🧪 {summary['sessions']} sessions × {summary['iterations']} iteration(s): "
+          f"{summary['reruns']} reruns in {summary['wall_s']:.1f} s")
+    if summary['latency'] is None:
+        print("No successful reruns")
+    else:
+        print(f"\n{'action':<10} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        rows = list(summary['latency_by_kind'].items()) + [('ALL', summary['latency'])]
+        for kind, stats in rows:
+            print(f"{kind:<10} {stats['count']:>6} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} "
+                  f"{stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f}")
+        for label, key in (('(service)', 'service'), ('(queue)', 'queue_wait')):
+            stats = summary[key]
+            print(f"{label:<10} {stats['count']:>6} {stats['p50_ms']:>9.1f} "
+                  f"{stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f}")
+        print("Reruns are serialized: latency = queue wait + service")
+
+        print(f"\n⚙️ CPU: {summary['cpu_s']:.1f} s total, {summary['cpu_per_rerun_ms']:.1f} ms per rerun")
+    if summary['process_peak_rss_growth_mb'] is None:
+        print("💾 Process peak RSS: not available on this platform")
+    else:
+        print(f"💾 Process peak RSS growth: {summary['process_peak_rss_growth_mb']:.1f} MB "
+              f"(≈{summary['avg_rss_growth_per_session_mb']:.1f} MB per session, averaged)")
+    if summary['traced_memory'] is not None:
+        print(f"   Python heap: {summary['traced_memory']['current_mb']:.1f} MB retained, "
+              f"{summary['traced_memory']['peak_mb']:.1f} MB peak")
+    if summary['errors']:
+        print(f"\n❌ {len(summary['errors'])} error(s):")
+        for error in summary['errors'][:10]:
+            print(f"  - {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-session load test for app.py")
+    parser.add_argument('--app', default='app.py', help="Streamlit script to drive")
+    parser.add_argument('--sessions', type=int, default=4, help="number of interleaved sessions")
+    parser.add_argument('--iterations', type=int, default=1,
+                        help="times each session repeats its interaction script")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the interaction scripts")
+    parser.add_argument('--timeout', type=float, default=120, help="per-rerun timeout in seconds")
+    parser.add_argument('--think', type=float, default=0.0,
+                        help="mean pause in seconds between a user's actions")
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help="skip Python heap tracing (it slows every allocation)")
+    parser.add_argument('--json', metavar='FILE', help="also write the summary as JSON")
+    args = parser.parse_args()
+
+    # AppTest runs the script without a server; silence the bare-mode warnings
+    set_log_level('error')
+
+    summary = run_load_test(args.app, args.sessions, args.iterations, args.seed,
+                            args.timeout, args.think, trace_memory=not args.no_tracemalloc)
+    print_summary(summary)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,132 @@
+import copy
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
-from scipy.integrate import solve_ivp
+
+from utils.cache import TrajectoryCache
+from utils.drag import SPHERE_CD_TABLE
+from utils.integrators import INTEGRATORS, LaunchProblem, resample, select_integrator
+
+# Worker pool shared by every simulator in the process. It is started on
+# first use with spawn (forking the multi-threaded Streamlit server is
+# unsafe) and kept for later calls; parallel solves only pay off when the
+# predicted time saved exceeds these costs. Measured by timing the first
+# pool.map and repeated submits of one compare_environments solve: a
+# spawned worker takes ~1 s to import numpy/scipy (workers start in
+# parallel, so ~1 s for the pool on a multi-core host, ~1 s per worker on
+# one core) and a warm task ~2 ms more than solving in-process. With the
+# default Auto integrator solves take milliseconds, so the pool is only
+# used for slow settings; override for other hosts through the environment
+POOL_STARTUP_COST = float(os.environ.get('PROJECTILE_POOL_STARTUP_COST', 1.0))  # s
+POOL_TASK_COST = float(os.environ.get('PROJECTILE_POOL_TASK_COST', 0.002))      # s
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _worker_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, 
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _discard_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+class TrajectoryResult:
+    """Sampled trajectory stored as one contiguous (N, 5) buffer
+    
+    Columns are t, x, y, vx, vy; the attributes of the same names are
+    views into the buffer, so no per-field arrays are copied. The buffer
+    may be float32 to halve memory. Speed, mechanical energy and the apex
+    index are computed on first access. For compatibility with the old
+    (t, x, y) tuples a result unpacks and indexes as (t, x, y). exact is
+    False for the Euler fallback used when the ODE solver fails.
+    """
+    
+    __slots__ = ('data', 'mass', 'g', 'exact', '_speed', '_energy', '_apex_index')
+    
+    COLUMNS = ('t', 'x', 'y', 'vx', 'vy')
+    
+    def __init__(self, data: np.ndarray, mass: float, g: float, exact: bool = True):
+        self.data = data
+        self.mass = mass
+        self.g = g
+        self.exact = exact
+        self._speed = None
+        self._energy = None
+        self._apex_index = None
+    
+    @classmethod
+    def from_columns(cls, t, x, y, vx, vy, mass: float, g: float, 
+                     dtype=np.float64) -> 'TrajectoryResult':
+        """Pack separate sample arrays into a single buffer"""
+        data = np.empty((len(t), len(cls.COLUMNS)), dtype=dtype)
+        for i, column in enumerate((t, x, y, vx, vy)):
+            data[:, i] = column
+        return cls(data, mass, g)
+    
+    @property
+    def t(self) -> np.ndarray:
+        return self.data[:, 0]
+    
+    @property
+    def x(self) -> np.ndarray:
+        return self.data[:, 1]
+    
+    @property
+    def y(self) -> np.ndarray:
+        return self.data[:, 2]
+    
+    @property
+    def vx(self) -> np.ndarray:
+        return self.data[:, 3]
+    
+    @property
+    def vy(self) -> np.ndarray:
+        return self.data[:, 4]
+    
+    @property
+    def speed(self) -> np.ndarray:
+        if self._speed is None:
+            self._speed = np.hypot(self.vx, self.vy)
+        return self._speed
+    
+    @property
+    def energy(self) -> np.ndarray:
+        """Mechanical energy (kinetic + potential) in joules"""
+        if self._energy is None:
+            self._energy = self.mass * (0.5 * self.speed**2 + self.g * self.y)
+        return self._energy
+    
+    @property
+    def apex_index(self) -> int:
+        if self._apex_index is None:
+            self._apex_index = int(np.argmax(self.y))
+        return self._apex_index
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    def __iter__(self):
+        return iter((self.t, self.x, self.y))
+    
+    def __getitem__(self, index):
+        return (self.t, self.x, self.y)[index]
+
 
 class ProjectileSimulator:
-    def __init__(self):
+    def __init__(self, cache_dir: str = None):
         # Physical constants
         self.g_earth = 9.81
         self.g_moon = 1.62
@@ -15,29 +139,76 @@ class ProjectileSimulator:
         self.rho_mars = 0.02
         self.rho_jupiter = 0.16
         
+        # Dynamic viscosities (Pa·s), approximate, for the Reynolds number
+        self.mu_earth = 1.81e-5
+        self.mu_moon = 1.81e-5  # unused: no atmosphere, so Re is always 0
+        self.mu_mars = 1.08e-5
+        self.mu_jupiter = 6.0e-6
+        
         # Current values
         self.g = self.g_earth
         self.rho = self.rho_earth
+        self.mu = self.mu_earth
         self.Cd = 0.47  # Drag coefficient for sphere
         
+        # 'constant' uses self.Cd; 'reynolds' looks up Cd(Re) for a sphere
+        self.drag_model = 'constant'
+        
+        # (gravity, air density) per environment
+        self.environments = {
+            'earth': (self.g_earth, self.rho_earth),
+            'moon': (self.g_moon, self.rho_moon),
+            'mars': (self.g_mars, self.rho_mars),
+            'jupiter': (self.g_jupiter, self.rho_jupiter),
+        }
+        
+        # ODE solver settings (also part of the cache key). 'backend' names
+        # an entry of INTEGRATORS or 'auto' to pick the cheapest one that
+        # meets rtol; max_step is only applied to a named backend
+        self.solver_settings = {
+            'backend': 'RK45',
+            'max_step': 0.001,  # Smaller step for accuracy
+            'rtol': 1e-9,
+            'atol': 1e-12,
+            't_max': 50.0,      # Max 50 seconds for safety
+        }
+        
+        # Optional on-disk cache of solved trajectories
+        self.cache = TrajectoryCache(cache_dir) if cache_dir else None
+        
     def set_environment(self, planet: str):
         """Set gravity and air density based on planet"""
         planet_lower = planet.lower()
         if 'earth' in planet_lower:
             self.g = self.g_earth
             self.rho = self.rho_earth
+            self.mu = self.mu_earth
         elif 'moon' in planet_lower:
             self.g = self.g_moon
             self.rho = self.rho_moon
+            self.mu = self.mu_moon
         elif 'mars' in planet_lower:
             self.g = self.g_mars
             self.rho = self.rho_mars
+            self.mu = self.mu_mars
         elif 'jupiter' in planet_lower:
             self.g = self.g_jupiter
             self.rho = self.rho_jupiter
+            self.mu = self.mu_jupiter
         else:
             self.g = self.g_earth
             self.rho = self.rho_earth
+            self.mu = self.mu_earth
+    
+    def reynolds_number(self, v, radius: float):
+        """Reynolds number of a sphere of the given radius at speed v"""
+        return self.rho * v * 2 * radius / self.mu
+    
+    def drag_coefficient(self, v, radius: float):
+        """Drag coefficient at speed v (scalar or array) for the current model"""
+        if self.drag_model == 'reynolds':
+            return SPHERE_CD_TABLE(self.reynolds_number(v, radius))
+        return self.Cd
             
     def without_air_resistance(self, u: float, theta: float, 
                               g: float = None) -> tuple:
@@ -76,7 +247,7 @@ class ProjectileSimulator:
             A = np.pi * radius**2
             
             # DRAG FORCE: F_d = 0.5 * ρ * Cd * A * v²
-            drag_magnitude = 0.5 * self.rho * self.Cd * A * v**2
+            drag_magnitude = 0.5 * self.rho * self.drag_coefficient(v, radius) * A * v**2
             
             # Drag acceleration components (a_drag = F_d / m)
             # Direction opposite to velocity
@@ -91,8 +262,53 @@ class ProjectileSimulator:
     
     def with_air_resistance(self, u: float, theta: float, 
                            mass: float = 0.1, 
-                           radius: float = 0.05) -> tuple:
-        """Numerical solution with drag - IMPROVED"""
+                           radius: float = 0.05, 
+                           dtype=np.float64, 
+                           backend: str = None) -> TrajectoryResult:
+        """Numerical solution with drag - IMPROVED
+        
+        backend overrides solver_settings['backend'] for this call.
+        """
+        dtype = np.dtype(dtype)
+        backend = backend or self.solver_settings['backend']
+        
+        def compute():
+            result = self._integrate_drag(u, theta, mass, radius, dtype, backend)
+            return (result.data,), result.exact
+        
+        (data,), exact = self._cached('drag', compute,
+                                      u=u, theta=theta, mass=mass, radius=radius, 
+                                      dtype=dtype.name, backend=backend)
+        return TrajectoryResult(data, mass, self.g, exact)
+    
+    def _cached(self, kind: str, compute, **params) -> tuple:
+        """Serve a result from the disk cache, computing and storing it on a miss
+        
+        compute returns (arrays, exact). Inexact results (from the Euler
+        fallback after a solver failure) are returned but never stored, so
+        a transient failure is not served as a real solve later. Returns
+        (arrays, exact).
+        """
+        if self.cache is None:
+            return compute()
+        
+        key = TrajectoryCache.key(kind, g=self.g, rho=self.rho, Cd=self.Cd,
+                                  mu=self.mu, drag_model=self.drag_model,
+                                  solver=self.solver_settings,
+                                  **{name: float(value) if isinstance(value, (int, float)) else value
+                                     for name, value in params.items()})
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached, True
+        
+        arrays, exact = compute()
+        if exact:
+            self.cache.put(key, arrays)
+        return arrays, exact
+    
+    def _launch_problem(self, u: float, theta: float, 
+                        mass: float, radius: float) -> LaunchProblem:
+        """Drag ODE for one launch in the form the integrator backends take"""
         theta_rad = np.radians(theta)
         
         # Initial conditions [vx, vy, x, y]
@@ -103,49 +319,329 @@ class ProjectileSimulator:
             0.0                     # y
         ]
         
-        # Event to stop when projectile hits ground
-        def hit_ground(t, state):
-            return state[3]  # y position
-        hit_ground.terminal = True
-        hit_ground.direction = -1
-        
-        # Time span (max 50 seconds for safety)
-        t_span = (0, 50)
+        # Drag deceleration per unit velocity at launch; with Cd(Re) the
+        # subcritical plateau bounds Cd from below as the projectile slows
+        drag_rate = 0.0
+        if self.rho > 0.001:
+            Cd = float(self.drag_coefficient(u, radius))
+            if self.drag_model == 'reynolds':
+                Cd = max(Cd, 0.5)
+            drag_rate = 0.5 * self.rho * Cd * np.pi * radius**2 * u / mass
         
+        return LaunchProblem(
+            rhs=lambda t, y: self._drag_equation(t, y, mass, radius),
+            y0=initial_state,
+            g=self.g,
+            drag_rate=drag_rate,
+            t_max=self.solver_settings['t_max'],
+            drag_model=self.drag_model
+        )
+    
+    def _integrate_drag(self, u: float, theta: float, mass: float, radius: float, 
+                        dtype=np.float64, backend: str = 'RK45') -> TrajectoryResult:
+        """Solve the drag ODE, falling back to Euler integration on failure"""
+        settings = self.solver_settings
         try:
-            # Solve ODE with higher precision
-            solution = solve_ivp(
-                fun=lambda t, y: self._drag_equation(t, y, mass, radius),
-                t_span=t_span,
-                y0=initial_state,
-                method='RK45',
-                events=[hit_ground],
-                max_step=0.001,  # Smaller step for accuracy
-                rtol=1e-9,
-                atol=1e-12,
-                dense_output=True
-            )
-            
-            # Extract solution
-            if len(solution.t) > 0:
-                t_sol = solution.t
-                x_sol = solution.y[2]
-                y_sol = solution.y[3]
-                
-                # Filter positive y values
-                valid = y_sol >= -0.01  # Small tolerance for ground impact
-                if np.any(valid):
-                    return t_sol[valid], x_sol[valid], y_sol[valid]
+            problem = self._launch_problem(u, theta, mass, radius)
+            if backend == 'auto':
+                integrator = select_integrator(problem, settings['rtol'])
+                max_step = np.inf
+            else:
+                integrator = INTEGRATORS[backend]
+                max_step = settings['max_step']
+            
+            t_sol, y_sol = integrator.solve(problem, settings['rtol'], settings['atol'], max_step)
+            
+            if len(t_sol) > 1:
+                # Adaptive solvers may take only a handful of steps
+                if len(t_sol) < 200:
+                    t_sol, y_sol = resample(t_sol, y_sol, 200)
+                vx_sol, vy_sol, x_sol, y_pos = y_sol
+                return TrajectoryResult.from_columns(t_sol, x_sol, y_pos, vx_sol, vy_sol,
+                                                     mass, self.g, dtype)
             
             # Fallback if no valid solution
-            return self._simple_drag_model(u, theta, mass, radius)
+            return self._simple_drag_model(u, theta, mass, radius, dtype)
             
         except Exception as e:
             print(f"ODE solver error: {e}")
-            return self._simple_drag_model(u, theta, mass, radius)
+            return self._simple_drag_model(u, theta, mass, radius, dtype)
+    
+    def estimate_solve_cost(self, u: float, theta: float, 
+                            mass: float = 0.1, radius: float = 0.05) -> float:
+        """Predicted seconds for one with_air_resistance solve"""
+        settings = self.solver_settings
+        problem = self._launch_problem(u, theta, mass, radius)
+        if settings['backend'] == 'auto':
+            return float(select_integrator(problem, settings['rtol']).estimate_cost(problem, settings['rtol']))
+        
+        # A named backend is capped at max_step
+        integrator = INTEGRATORS[settings['backend']]
+        return max(integrator.estimate_cost(problem, settings['rtol']), 
+                   problem.flight_time / settings['max_step'] * integrator.step_cost)
+    
+    def work_precision(self, u: float, theta: float, 
+                       mass: float = 0.1, radius: float = 0.05, 
+                       tolerances=(1e-3, 1e-5, 1e-7, 1e-9), 
+                       backends=None) -> list:
+        """Cost and range error of every backend over a set of tolerances
+        
+        The reference range comes from RK45 at rtol=1e-13; DOP853 does not
+        converge that far in the Reynolds mode, whose Cd(Re) spline has
+        jumps in its third derivative at the knots. Returns one
+        dict per (backend, rtol) with the measured time, RHS evaluations,
+        relative range error, the problem's stiffness and the cost model's
+        prediction; utils.integrators.fit_backends turns rows collected
+        across launches into the coefficients used by the 'auto' mode.
+        """
+        reference = self._launch_problem(u, theta, mass, radius)
+        t_ref, y_ref = INTEGRATORS['RK45'].solve(reference, 1e-13, 1e-16)
+        range_ref = y_ref[2][-1]
+        
+        rows = []
+        for name in (backends or INTEGRATORS):
+            integrator = INTEGRATORS[name]
+            for rtol in tolerances:
+                problem = self._launch_problem(u, theta, mass, radius)
+                if not integrator.supports(problem):
+                    continue
+                start = time.perf_counter()
+                t_sol, y_sol = integrator.solve(problem, rtol, rtol * 1e-3)
+                elapsed = time.perf_counter() - start
+                rows.append({
+                    'backend': name,
+                    'rtol': rtol,
+                    'time_s': elapsed,
+                    'predicted_s': integrator.estimate_cost(problem, rtol),
+                    'nfev': problem.nfev,
+                    'steps': len(t_sol) - 1,
+                    'stiffness': problem.drag_rate * problem.flight_time,
+                    'drag_model': self.drag_model,
+                    'range_error': abs(y_sol[2][-1] - range_ref) / abs(range_ref),
+                })
+        return rows
+    
+    def trajectory_frames(self, u: float, theta: float, 
+                          mass: float = 0.1, radius: float = 0.05, 
+                          n_frames: int = 60, drag: bool = True, 
+                          result: TrajectoryResult = None) -> tuple:
+        """Ideal and drag positions resampled onto one shared time grid
+        
+        Returns (t, x_ideal, y_ideal, x_drag, y_drag), each of length
+        n_frames. A trajectory that lands before the end of the grid
+        stays at its landing point for the remaining frames. The ideal
+        frames are exact; the drag frames are linearly interpolated
+        between the samples of the with_air_resistance result, not taken
+        from the solver's dense output. A solve of fewer than 200 steps,
+        typical under 'auto', has itself already been resampled to 200
+        points by cubic Hermite interpolation. Pass that result for the
+        same launch as result to avoid solving it again.
+        """
+        frames, _ = self._cached('frames', 
+                                 lambda: self._build_frames(u, theta, mass, radius, n_frames, 
+                                                            drag, result),
+                                 u=u, theta=theta, mass=mass, radius=radius, 
+                                 n_frames=n_frames, drag=drag)
+        return frames
+    
+    def _build_frames(self, u: float, theta: float, mass: float, radius: float, 
+                      n_frames: int, drag: bool, result: TrajectoryResult = None) -> tuple:
+        """Uncached body of trajectory_frames; returns (frames, exact)"""
+        theta_rad = np.radians(theta)
+        t_ideal = 2 * u * np.sin(theta_rad) / self.g
+        
+        t_drag = t_ideal
+        if drag:
+            if result is None:
+                result = self.with_air_resistance(u, theta, mass, radius)
+            t_sol, x_sol, y_sol = result
+            t_drag = float(t_sol[-1])
+        
+        t = np.linspace(0, max(t_ideal, t_drag), n_frames)
+        
+        # Ideal trajectory evaluated analytically, clamped at landing
+        t_i = np.minimum(t, t_ideal)
+        x_ideal = u * np.cos(theta_rad) * t_i
+        y_ideal = np.maximum(u * np.sin(theta_rad) * t_i - 0.5 * self.g * t_i**2, 0.0)
+        
+        if not drag:
+            return (t, x_ideal, y_ideal, x_ideal.copy(), y_ideal.copy()), True
+        
+        t_d = np.minimum(t, t_drag)
+        x_drag = np.interp(t_d, t_sol, x_sol)
+        y_drag = np.interp(t_d, t_sol, y_sol)
+        
+        return (t, x_ideal, y_ideal, x_drag, np.maximum(y_drag, 0.0)), result.exact
+    
+    def compare_environments(self, u: float, theta: float, 
+                             mass: float = 0.1, radius: float = 0.05, 
+                             drag: bool = True) -> dict:
+        """Solve the same launch in every environment in one call
+        
+        Returns {planet: TrajectoryResult}. Environments without a significant
+        atmosphere use the analytical solution. The drag solves run
+        concurrently on the shared worker pool when their predicted cost
+        makes that worthwhile, so the total latency is close to that of
+        the slowest single solve; cheap ones are solved in-process.
+        """
+        numeric = [planet for planet, (g, rho) in self.environments.items()
+                   if drag and rho > 0.001]
+        
+        results = {}
+        for planet in self.environments:
+            if planet not in numeric:
+                results[planet] = _solve_environment(self, planet, u, theta, 
+                                                     mass, radius, False)
+        
+        workers = min(len(numeric), os.cpu_count() or 1)
+        if workers > 1:
+            costs = [self._environment(planet).estimate_solve_cost(u, theta, mass, radius)
+                     for planet in numeric]
+            saving = sum(costs) - max(costs)
+            overhead = len(numeric) * POOL_TASK_COST + (POOL_STARTUP_COST if _pool is None else 0.0)
+            if saving > overhead:
+                try:
+                    pool = _worker_pool(workers)
+                    futures = {
+                        planet: pool.submit(_solve_environment, self, planet, u, theta, 
+                                            mass, radius, True)
+                        for planet in numeric
+                    }
+                    for planet, future in futures.items():
+                        results[planet] = future.result()
+                except Exception as e:
+                    print(f"Parallel solve error: {e}")
+                    _discard_pool()
+        
+        # In-process path for cheap solves, single-core hosts or a failed pool
+        for planet in numeric:
+            if planet not in results:
+                results[planet] = _solve_environment(self, planet, u, theta, 
+                                                     mass, radius, True)
+        
+        return {planet: results[planet] for planet in self.environments}
     
-    def _simple_drag_model(self, u: float, theta: float, 
-                          mass: float, radius: float) -> tuple:
+    def batch_metrics(self, u, theta, mass: float = 0.1, radius: float = 0.05, 
+                      drag: bool = True, n_steps: int = 400) -> dict:
+        """Range, maximum height and flight time for many launches at once
+        
+        u and theta may be arrays (they are broadcast together). All drag
+        launches are integrated together with a vectorized RK4. Each launch
+        takes steps of 1/n_steps of its own ideal flight time, shortened to
+        a tenth of the drag time scale 1/(k*v) at its current speed, so strongly
+        damped launches stay stable without small steps for the whole flight.
+        Launches leave the arrays as they land, so the work per step shrinks
+        as the batch lands; the landing point is found by linear
+        interpolation across the last step. Returns a dict of arrays keyed
+        'range', 'max_height', 'flight_time'.
+        """
+        u, theta = np.broadcast_arrays(np.asarray(u, dtype=float), 
+                                       np.asarray(theta, dtype=float))
+        theta_rad = np.radians(theta)
+        vx = u * np.cos(theta_rad)
+        vy = u * np.sin(theta_rad)
+        t_ideal = 2 * vy / self.g
+        
+        if not drag or self.rho <= 0.001:
+            return {
+                'range': vx * t_ideal,
+                'max_height': vy**2 / (2 * self.g),
+                'flight_time': t_ideal,
+            }
+        
+        k0 = 0.5 * self.rho * np.pi * radius**2 / mass
+        g = self.g
+        
+        # Drag deceleration per unit velocity, k * v, at speed v
+        if self.drag_model == 'reynolds':
+            def drag_rate(vx, vy):
+                v = np.sqrt(vx**2 + vy**2)
+                return k0 * self.drag_coefficient(v, radius) * v
+        else:
+            def drag_rate(vx, vy):
+                return k0 * self.Cd * np.sqrt(vx**2 + vy**2)
+        
+        shape = vx.shape
+        range_ = np.zeros(vx.size)
+        flight_time = np.zeros(vx.size)
+        max_height = np.zeros(vx.size)
+        
+        # State of the launches still in flight, indexed by active
+        active = np.arange(vx.size)
+        vx, vy = vx.ravel().copy(), vy.ravel().copy()
+        h_max = t_ideal.ravel() / n_steps
+        x = np.zeros_like(vx)
+        y = np.zeros_like(vx)
+        t = np.zeros_like(vx)
+        apex = np.zeros_like(vx)
+        
+        # Each launch lands within n_steps full steps plus the shortened
+        # ones; the cap only guards against a runaway loop
+        for _ in range(100 * n_steps):
+            # Classic RK4 on (vx, vy, x, y); h * k * v <= 0.1 keeps the
+            # error near that of the unshortened steps
+            kv1 = drag_rate(vx, vy)
+            h = np.minimum(h_max, 0.1 / np.maximum(kv1, 1e-12))
+            ax1, ay1 = -kv1 * vx, -g - kv1 * vy
+            vx2, vy2 = vx + 0.5 * h * ax1, vy + 0.5 * h * ay1
+            kv2 = drag_rate(vx2, vy2)
+            ax2, ay2 = -kv2 * vx2, -g - kv2 * vy2
+            vx3, vy3 = vx + 0.5 * h * ax2, vy + 0.5 * h * ay2
+            kv3 = drag_rate(vx3, vy3)
+            ax3, ay3 = -kv3 * vx3, -g - kv3 * vy3
+            vx4, vy4 = vx + h * ax3, vy + h * ay3
+            kv4 = drag_rate(vx4, vy4)
+            ax4, ay4 = -kv4 * vx4, -g - kv4 * vy4
+            
+            x_new = x + h / 6 * (vx + 2 * vx2 + 2 * vx3 + vx4)
+            y_new = y + h / 6 * (vy + 2 * vy2 + 2 * vy3 + vy4)
+            vy_old = vy
+            vx = vx + h / 6 * (ax1 + 2 * ax2 + 2 * ax3 + ax4)
+            vy = vy + h / 6 * (ay1 + 2 * ay2 + 2 * ay3 + ay4)
+            
+            # Apex inside the step where vy changes sign, from constant
+            # deceleration across the step
+            peaking = (vy_old > 0) & (vy <= 0)
+            peak = y + vy_old**2 * h / (2 * np.maximum(vy_old - vy, 1e-12))
+            apex = np.maximum(apex, np.where(peaking, peak, y_new))
+            
+            crossing = y_new < 0
+            if np.any(crossing):
+                frac = y[crossing] / (y[crossing] - y_new[crossing])
+                landed = active[crossing]
+                range_[landed] = x[crossing] + frac * (x_new[crossing] - x[crossing])
+                flight_time[landed] = t[crossing] + frac * h[crossing]
+                max_height[landed] = apex[crossing]
+                
+                flying = ~crossing
+                active, vx, vy, h, h_max, apex = (active[flying], vx[flying], vy[flying], 
+                                                  h[flying], h_max[flying], apex[flying])
+                x, y, t = x_new[flying], y_new[flying], t[flying]
+                if active.size == 0:
+                    break
+            else:
+                x, y = x_new, y_new
+            t = t + h
+        
+        # Launches that never landed (should not happen) report their last point
+        range_[active] = x
+        flight_time[active] = t
+        max_height[active] = apex
+        
+        return {
+            'range': range_.reshape(shape),
+            'max_height': max_height.reshape(shape),
+            'flight_time': flight_time.reshape(shape),
+        }
+    
+    def _environment(self, planet: str) -> 'ProjectileSimulator':
+        """Shallow copy of this simulator switched to another planet"""
+        sim = copy.copy(self)
+        sim.set_environment(planet)
+        return sim
+    
+    def _simple_drag_model(self, u: float, theta: float, mass: float, 
+                          radius: float, dtype=np.float64) -> TrajectoryResult:
         """Simple Euler integration fallback - IMPROVED"""
         theta_rad = np.radians(theta)
         dt = 0.0005  # Smaller time step for accuracy
@@ -157,6 +653,7 @@ class ProjectileSimulator:
         
         # Store results
         t_list, x_list, y_list = [0], [0], [0]
+        vx_list, vy_list = [vx], [vy]
         
         # Cross-sectional area
         A = np.pi * radius**2
@@ -171,7 +668,7 @@ class ProjectileSimulator:
             
             # Calculate drag if applicable
             if v > 0.01 and self.rho > 0.001:
-                drag = 0.5 * self.rho * self.Cd * A * v**2
+                drag = 0.5 * self.rho * self.drag_coefficient(v, radius) * A * v**2
                 ax_drag = -drag * vx / (mass * v)
                 ay_drag = -drag * vy / (mass * v)
             else:
@@ -190,8 +687,28 @@ class ProjectileSimulator:
             t_list.append(t_list[-1] + dt)
             x_list.append(x)
             y_list.append(y)
+            vx_list.append(vx)
+            vy_list.append(vy)
         
-        return np.array(t_list), np.array(x_list), np.array(y_list)
+        result = TrajectoryResult.from_columns(t_list, x_list, y_list, vx_list, vy_list,
+                                               mass, self.g, dtype)
+        result.exact = False
+        return result
+
+def _solve_environment(sim: ProjectileSimulator, planet: str, u: float, 
+                       theta: float, mass: float, radius: float, 
+                       drag: bool) -> TrajectoryResult:
+    """Solve one launch in one environment (module level so it can be pickled)"""
+    sim = sim._environment(planet)
+    if drag and sim.rho > 0.001:
+        return sim.with_air_resistance(u, theta, mass, radius)
+    
+    x, y = sim.without_air_resistance(u, theta)
+    theta_rad = np.radians(theta)
+    t = x / (u * np.cos(theta_rad))
+    vx = np.full_like(t, u * np.cos(theta_rad))
+    vy = u * np.sin(theta_rad) - sim.g * t
+    return TrajectoryResult.from_columns(t, x, y, vx, vy, mass, sim.g)
 
 # Test function
 if __name__ == "__main__":
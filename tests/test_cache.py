@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import utils.cache
+from simulation import ProjectileSimulator
+from utils.cache import TrajectoryCache
+from utils.integrators import INTEGRATORS
+
+
+def _entries(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith('.npz'))
+
+
+def _age(cache, key, seconds):
+    """Push an entry's modification time into the past"""
+    path = cache._path(key)
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def test_round_trip_and_key_sensitivity(tmp_path):
+    cache = TrajectoryCache(str(tmp_path))
+    key = TrajectoryCache.key('drag', u=30.0, theta=45.0)
+    assert key == TrajectoryCache.key('drag', theta=45.0, u=30.0)
+    assert key != TrajectoryCache.key('drag', u=30.0, theta=46.0)
+    assert cache.get(key) is None
+
+    cache.put(key, (np.arange(5.0), np.ones((2, 3))))
+    a, b = cache.get(key)
+    np.testing.assert_array_equal(a, np.arange(5.0))
+    np.testing.assert_array_equal(b, np.ones((2, 3)))
+
+
+def test_failed_write_keeps_previous_entry(tmp_path, monkeypatch):
+    cache = TrajectoryCache(str(tmp_path))
+    key = TrajectoryCache.key('drag', u=1.0)
+    cache.put(key, (np.zeros(3),))
+
+    def broken_save(f, *arrays):
+        f.write(b'partial')
+        raise OSError("disk full")
+
+    monkeypatch.setattr(utils.cache.np, 'savez_compressed', broken_save)
+    cache.put(key, (np.ones(3),))
+
+    np.testing.assert_array_equal(cache.get(key)[0], np.zeros(3))
+    assert os.listdir(tmp_path) == [key + '.npz']
+
+
+def test_corrupt_entry_reads_as_miss(tmp_path):
+    cache = TrajectoryCache(str(tmp_path))
+    key = TrajectoryCache.key('drag', u=1.0)
+    with open(cache._path(key), 'wb') as f:
+        f.write(b'not a zip file')
+    assert cache.get(key) is None
+
+
+def test_lru_eviction_keeps_recently_read_entries(tmp_path):
+    cache = TrajectoryCache(str(tmp_path), max_bytes=10**9)
+    keys = [TrajectoryCache.key('drag', u=float(i)) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, (np.random.default_rng(i).random(2000),))
+        _age(cache, key, 300 - 100 * i)
+
+    # Reading the oldest entry makes it the most recently used
+    assert cache.get(keys[0]) is not None
+    size = os.path.getsize(cache._path(keys[0]))
+    cache.max_bytes = 2 * size + size // 2
+    cache.evict()
+
+    assert _entries(tmp_path) == sorted(key + '.npz' for key in (keys[0], keys[2]))
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = TrajectoryCache(str(tmp_path), max_age=60)
+    old, fresh = TrajectoryCache.key('drag', u=1.0), TrajectoryCache.key('drag', u=2.0)
+    cache.put(old, (np.zeros(3),))
+    cache.put(fresh, (np.zeros(3),))
+    _age(cache, old, 120)
+
+    assert cache.get(old) is None
+    cache.evict()
+    assert _entries(tmp_path) == [fresh + '.npz']
+
+
+def test_stale_temp_files_are_removed(tmp_path):
+    cache = TrajectoryCache(str(tmp_path))
+    stale, recent = tmp_path / 'dead.tmp', tmp_path / 'writing.tmp'
+    stale.write_bytes(b'x')
+    recent.write_bytes(b'x')
+    stamp = time.time() - 2 * TrajectoryCache.STALE_TMP_SECONDS
+    os.utime(stale, (stamp, stamp))
+
+    cache.evict()
+    assert not stale.exists()
+    assert recent.exists()
+
+
+def test_concurrent_readers_never_see_partial_entries(tmp_path):
+    cache = TrajectoryCache(str(tmp_path))
+    key = TrajectoryCache.key('drag', u=1.0)
+    cache.put(key, (np.zeros(20000),))
+    stop = threading.Event()
+    problems = []
+
+    def writer():
+        for version in range(1, 40):
+            cache.put(key, (np.full(20000, float(version)),))
+        stop.set()
+
+    def reader():
+        while not stop.is_set():
+            arrays = cache.get(key)
+            if arrays is None:
+                problems.append('miss')
+            elif len(np.unique(arrays[0])) != 1:
+                problems.append('mixed')
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert problems == []
+    assert not any(name.endswith('.tmp') for name in os.listdir(tmp_path))
+
+
+def test_solver_fallback_is_not_cached(tmp_path, monkeypatch):
+    sim = ProjectileSimulator(cache_dir=str(tmp_path))
+
+    def failing_solve(*args, **kwargs):
+        raise RuntimeError("transient")
+
+    monkeypatch.setattr(INTEGRATORS['RK45'], 'solve', failing_solve)
+    fallback = sim.with_air_resistance(30, 45)
+    assert not fallback.exact
+    assert _entries(tmp_path) == []
+
+    monkeypatch.undo()
+    solved = sim.with_air_resistance(30, 45)
+    assert solved.exact
+    assert len(_entries(tmp_path)) == 1
+    assert sim.with_air_resistance(30, 45).exact
+    assert solved.x[-1] == pytest.approx(sim.with_air_resistance(30, 45).x[-1])
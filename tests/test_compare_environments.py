@@ -0,0 +1,68 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+import simulation
+from simulation import ProjectileSimulator
+
+
+class WorkerFailingSimulator(ProjectileSimulator):
+    """Simulator whose drag solves fail inside pool workers only"""
+
+    def with_air_resistance(self, *args, **kwargs):
+        if multiprocessing.parent_process() is not None:
+            raise RuntimeError("worker crashed")
+        return super().with_air_resistance(*args, **kwargs)
+
+
+@pytest.fixture
+def forced_pool(monkeypatch):
+    """Make every drag comparison worth a pool and record pool use"""
+    monkeypatch.setattr(simulation.os, 'cpu_count', lambda: 4)
+    monkeypatch.setattr(simulation, 'POOL_STARTUP_COST', 0.0)
+    monkeypatch.setattr(simulation, 'POOL_TASK_COST', 0.0)
+    used = []
+    worker_pool = simulation._worker_pool
+    monkeypatch.setattr(simulation, '_worker_pool',
+                        lambda workers: used.append(workers) or worker_pool(workers))
+    yield used
+    simulation._discard_pool()
+
+
+def _in_process(sim, *args):
+    cpu_count = simulation.os.cpu_count
+    simulation.os.cpu_count = lambda: 1
+    try:
+        return sim.compare_environments(*args)
+    finally:
+        simulation.os.cpu_count = cpu_count
+
+
+def _assert_same(results, expected):
+    assert list(results) == list(expected)
+    for planet in expected:
+        np.testing.assert_allclose(results[planet].data, expected[planet].data)
+
+
+def test_pool_results_match_in_process(forced_pool):
+    sim = ProjectileSimulator()
+    sim.solver_settings['backend'] = 'auto'
+    expected = _in_process(sim, 40, 50, 0.2, 0.05)
+
+    results = sim.compare_environments(40, 50, 0.2, 0.05)
+    assert forced_pool == [3]
+    assert simulation._pool is not None
+    _assert_same(results, expected)
+
+
+def test_failing_worker_falls_back_in_process(forced_pool):
+    sim = WorkerFailingSimulator()
+    sim.solver_settings['backend'] = 'auto'
+    expected = _in_process(sim, 40, 50, 0.2, 0.05)
+
+    results = sim.compare_environments(40, 50, 0.2, 0.05)
+    assert forced_pool == [3]
+    assert simulation._pool is None
+    _assert_same(results, expected)
+    assert all(result.exact for result in results.values())
@@ -0,0 +1,86 @@
+import json
+import os
+
+from PIL import Image
+
+import download_images
+from download_images import THUMB_SIZE, LocalSource, build_assets
+
+
+def _write_jpeg(path, size=(1200, 600)):
+    Image.new('RGB', size, (30, 90, 200)).save(path, quality=90)
+
+
+def _manifest(asset_dir):
+    with open(os.path.join(asset_dir, 'manifest.json')) as f:
+        return json.load(f)
+
+
+def test_local_source_builds_full_image_and_thumbnail(tmp_path):
+    source_dir, asset_dir = tmp_path / 'source', tmp_path / 'assets'
+    source_dir.mkdir()
+    _write_jpeg(source_dir / 'earth.jpg')
+
+    statuses = build_assets(LocalSource(str(source_dir)), str(asset_dir), planets=['earth'])
+
+    assert statuses == {'earth': 'updated'}
+    with Image.open(asset_dir / 'thumbnails' / 'earth.png') as thumb:
+        assert thumb.width <= THUMB_SIZE[0] and thumb.height <= THUMB_SIZE[1]
+    assert (asset_dir / 'earth.jpg').exists()
+    assert _manifest(asset_dir)['earth']['decoded'] is True
+
+
+def test_unchanged_image_is_not_reprocessed(tmp_path):
+    source_dir, asset_dir = tmp_path / 'source', tmp_path / 'assets'
+    source_dir.mkdir()
+    _write_jpeg(source_dir / 'earth.jpg')
+    source = LocalSource(str(source_dir))
+
+    build_assets(source, str(asset_dir), planets=['earth'])
+    assert build_assets(source, str(asset_dir), planets=['earth']) == {'earth': 'unchanged'}
+
+    _write_jpeg(source_dir / 'earth.jpg', size=(800, 800))
+    assert build_assets(source, str(asset_dir), planets=['earth']) == {'earth': 'updated'}
+
+
+def test_missing_image_gets_placeholder(tmp_path):
+    source_dir, asset_dir = tmp_path / 'source', tmp_path / 'assets'
+    source_dir.mkdir()
+
+    statuses = build_assets(LocalSource(str(source_dir)), str(asset_dir), planets=['mars'])
+
+    assert statuses == {'mars': 'placeholder'}
+    assert (asset_dir / 'thumbnails' / 'mars.png').exists()
+    assert 'mars' not in _manifest(asset_dir)
+
+
+def test_undecodable_image_is_not_decoded_again(tmp_path, monkeypatch):
+    source_dir, asset_dir = tmp_path / 'source', tmp_path / 'assets'
+    source_dir.mkdir()
+    (source_dir / 'moon.jpg').write_bytes(b'not an image')
+    source = LocalSource(str(source_dir))
+
+    assert build_assets(source, str(asset_dir), planets=['moon']) == {'moon': 'failed'}
+    assert (asset_dir / 'thumbnails' / 'moon.png').exists()
+    assert _manifest(asset_dir)['moon']['decoded'] is False
+
+    opened = []
+    real_open = download_images.Image.open
+    monkeypatch.setattr(download_images.Image, 'open',
+                        lambda *args, **kwargs: opened.append(args) or real_open(*args, **kwargs))
+    assert build_assets(source, str(asset_dir), planets=['moon']) == {'moon': 'failed'}
+    assert opened == []
+
+
+def test_manifest_with_bare_digests_is_still_read(tmp_path):
+    source_dir, asset_dir = tmp_path / 'source', tmp_path / 'assets'
+    source_dir.mkdir()
+    _write_jpeg(source_dir / 'earth.jpg')
+    source = LocalSource(str(source_dir))
+    build_assets(source, str(asset_dir), planets=['earth'])
+
+    digest = _manifest(asset_dir)['earth']['sha256']
+    with open(asset_dir / 'manifest.json', 'w') as f:
+        json.dump({'earth': digest}, f)
+
+    assert build_assets(source, str(asset_dir), planets=['earth']) == {'earth': 'unchanged'}
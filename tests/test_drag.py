@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from utils.drag import SPHERE_CD_TABLE, sphere_drag_coefficient
+
+
+def test_table_matches_correlation():
+    re = np.logspace(-1, 7, 50001)
+    exact = sphere_drag_coefficient(re)
+    assert np.max(np.abs(SPHERE_CD_TABLE(re) - exact) / exact) < 1e-7
+
+
+def test_scalar_and_array_evaluation_agree():
+    re = np.array([0.5, 3e3, 2.6e5, 4e6])
+    for value, expected in zip(re, SPHERE_CD_TABLE(re)):
+        assert SPHERE_CD_TABLE(float(value)) == pytest.approx(expected, rel=1e-12)
+        assert SPHERE_CD_TABLE(value) == pytest.approx(expected, rel=1e-12)
+
+
+def test_slope_is_continuous_across_knots():
+    table = SPHERE_CD_TABLE
+    knots = table.log_re[1:-1:97]
+    h = 1e-6
+    left = (table(10**knots) - table(10**(knots - h))) / h
+    right = (table(10**(knots + h)) - table(10**knots)) / h
+    assert np.max(np.abs(right - left) / (1 + np.abs(left))) < 1e-4
+
+
+def test_out_of_range_values_clamp():
+    assert SPHERE_CD_TABLE(0.0) == pytest.approx(SPHERE_CD_TABLE(0.1))
+    assert SPHERE_CD_TABLE(1e9) == pytest.approx(SPHERE_CD_TABLE(1e7))
+    np.testing.assert_allclose(SPHERE_CD_TABLE(np.array([0.0, 1e9])),
+                               SPHERE_CD_TABLE(np.array([0.1, 1e7])))
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from simulation import ProjectileSimulator
+from utils.integrators import INTEGRATORS, fit_backends, select_integrator
+
+
+def _problem(planet='earth', drag_model='reynolds', u=100, mass=0.01, radius=0.5):
+    sim = ProjectileSimulator()
+    sim.set_environment(planet)
+    sim.drag_model = drag_model
+    return sim, sim._launch_problem(u, 45, mass, radius)
+
+
+def test_backends_missing_their_tolerance_are_not_selected(monkeypatch):
+    _, problem = _problem()
+    cheapest = min((backend for backend in INTEGRATORS.values() if backend.supports(problem)),
+                   key=lambda backend: backend.estimate_cost(problem, 1e-9))
+    monkeypatch.setattr(cheapest, 'error_ratios', {'reynolds': 2.0})
+    assert select_integrator(problem, 1e-9) is not cheapest
+
+
+def test_error_ratio_depends_on_drag_model():
+    dop853 = INTEGRATORS['DOP853']
+    assert dop853.error_ratio(_problem(drag_model='constant')[1]) <= 1.0
+    assert dop853.error_ratio(_problem(drag_model='reynolds')[1]) > 1.0
+
+
+@pytest.mark.parametrize('planet, drag_model', [('earth', 'reynolds'), ('mars', 'constant'),
+                                               ('jupiter', 'constant')])
+def test_auto_choice_meets_tolerance(planet, drag_model):
+    sim, problem = _problem(planet, drag_model)
+    reference = INTEGRATORS['RK45'].solve(problem, 1e-13, 1e-16)[1][2][-1]
+
+    _, problem = _problem(planet, drag_model)
+    backend = select_integrator(problem, 1e-9)
+    assert backend.error_ratio(problem) <= 1.0
+    x_range = backend.solve(problem, 1e-9, 1e-12)[1][2][-1]
+    assert abs(x_range - reference) <= 1e-9 * reference
+
+
+def test_vacuum_uses_analytic_solution():
+    sim = ProjectileSimulator()
+    sim.set_environment('moon')
+    assert select_integrator(sim._launch_problem(30, 45, 0.1, 0.05), 1e-9).name == 'analytic'
+
+
+def test_fit_backends_recovers_power_law():
+    rows = [{'backend': 'RK45', 'rtol': rtol, 'stiffness': stiffness,
+             'time_s': 1e-3 * rtol ** -0.1 * (1 + stiffness) ** 0.25, 'steps': 10,
+             'range_error': (0.5 if drag_model == 'constant' else 2.0) * rtol,
+             'drag_model': drag_model}
+            for rtol in (1e-6, 1e-7, 1e-9) for stiffness in (0.0, 2.0, 100.0)
+            for drag_model in ('constant', 'reynolds')]
+    fit = fit_backends(rows)['RK45']
+    np.testing.assert_allclose(fit['cost_coeffs'], (np.log(1e-3), 0.1, 0.25), atol=1e-9)
+    assert fit['error_ratios'] == pytest.approx({'constant': 0.5, 'reynolds': 2.0})
@@ -0,0 +1,62 @@
+import threading
+import tracemalloc
+
+import utils.profiling
+from utils.profiling import RerunProfiler
+
+
+def _in_thread(target):
+    """Run target on a separate thread and return its result"""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(target()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_second_rerun_skips_busy_resources(tmp_path):
+    first = RerunProfiler(True, memory=True, cprofile=True, log_dir=str(tmp_path))
+    first.phase('solve')
+
+    def second_rerun():
+        second = RerunProfiler(True, memory=True, cprofile=True, log_dir=str(tmp_path))
+        second.phase('solve')
+        return second.finish()
+
+    report = _in_thread(second_rerun)
+    assert sorted(report['skipped']) == ['cprofile', 'memory']
+    assert 'process_peak_kb' not in report['phases'][0]
+
+    report = first.finish()
+    assert 'skipped' not in report
+    assert 'process_peak_kb' in report['phases'][0]
+    assert 'cprofile_top' in report
+    assert not tracemalloc.is_tracing()
+
+
+def test_resources_of_an_abandoned_rerun_are_reclaimed(tmp_path):
+    # A rerun whose thread ended without finish() must not block others
+    _in_thread(lambda: RerunProfiler(True, memory=True, cprofile=True, log_dir=str(tmp_path)))
+
+    profiler = RerunProfiler(True, memory=True, cprofile=True, log_dir=str(tmp_path))
+    profiler.phase('solve')
+    report = profiler.finish()
+    assert 'skipped' not in report
+    assert not tracemalloc.is_tracing()
+
+
+def test_cprofile_already_active_is_skipped(tmp_path, monkeypatch):
+    class BusyProfile:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(utils.profiling.cProfile, 'Profile', BusyProfile)
+    profiler = RerunProfiler(True, cprofile=True, log_dir=str(tmp_path))
+    profiler.phase('solve')
+    report = profiler.finish()
+    assert report['skipped'] == ['cprofile']
+    assert 'cprofile_top' not in report
+
+    monkeypatch.undo()
+    report = RerunProfiler(True, cprofile=True, log_dir=str(tmp_path)).finish()
+    assert 'cprofile_top' in report
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from simulation import ProjectileSimulator
+from utils.calculations import coarse_grid, refine_grid, trajectory_metrics
+
+
+def _simulator(planet, drag_model='constant'):
+    sim = ProjectileSimulator()
+    sim.set_environment(planet)
+    sim.drag_model = drag_model
+    sim.solver_settings['backend'] = 'auto'
+    return sim
+
+
+@pytest.mark.parametrize('planet, drag_model', [('earth', 'constant'), ('mars', 'reynolds')])
+@pytest.mark.parametrize('mass, radius', [(0.1, 0.05), (0.01, 0.5)])
+def test_batch_metrics_match_single_solves(planet, drag_model, mass, radius):
+    sim = _simulator(planet, drag_model)
+    u = np.array([15.0, 40.0, 95.0])
+    theta = np.array([20.0, 45.0, 70.0])
+    batch = sim.batch_metrics(u, theta, mass, radius)
+
+    for i in range(len(u)):
+        single = trajectory_metrics(*sim.with_air_resistance(u[i], theta[i], mass, radius))
+        assert batch['range'][i] == pytest.approx(single['range'], rel=5e-5)
+        assert batch['flight_time'][i] == pytest.approx(single['flight_time'], rel=5e-5)
+        # The single solve only sees the apex at its samples
+        assert batch['max_height'][i] == pytest.approx(single['max_height'], rel=1e-4)
+
+
+def test_batch_metrics_broadcast_shape():
+    sim = _simulator('earth')
+    theta, u = np.meshgrid([30.0, 60.0], [20.0, 50.0, 80.0], indexing='ij')
+    batch = sim.batch_metrics(u, theta)
+    assert all(values.shape == (2, 3) for values in batch.values())
+
+
+@pytest.mark.parametrize('planet, drag', [('moon', True), ('earth', False)])
+def test_batch_metrics_vacuum_closed_form(planet, drag):
+    sim = _simulator(planet)
+    u = np.array([10.0, 55.0])
+    theta = np.array([30.0, 60.0])
+    batch = sim.batch_metrics(u, theta, drag=drag)
+
+    vx, vy = u * np.cos(np.radians(theta)), u * np.sin(np.radians(theta))
+    np.testing.assert_allclose(batch['flight_time'], 2 * vy / sim.g)
+    np.testing.assert_allclose(batch['range'], u**2 * np.sin(np.radians(2 * theta)) / sim.g)
+    np.testing.assert_allclose(batch['max_height'], vy**2 / (2 * sim.g))
+
+
+def test_refine_grid_solves_only_flagged_cells():
+    # A step between u=50 and u=60 on top of a slight curve that stays
+    # below the refinement tolerance everywhere else
+    def field(theta, u):
+        return np.where(u > 55, 1.0, 0.0) + 1e-4 * ((u - 10) / 90)**2 + 0 * theta
+
+    solved_points = []
+
+    def solve(theta, u):
+        solved_points.extend(zip(theta, u))
+        return {'range': field(theta, u)}
+
+    angles, velocities, values, _ = coarse_grid(solve)
+    coarse = values['range']
+    solved_points.clear()
+
+    fine_angles, fine_velocities, fine, n_solved = refine_grid(solve, angles, velocities, values)
+    grid = fine['range']
+
+    # Only the points touching the velocity cell [50, 60] are solved: its
+    # middle column in full, its edges between the coarse angles
+    assert n_solved == len(solved_points) == 13 + 2 * 6
+    assert all(50 <= u <= 60 for _, u in solved_points)
+    assert grid[:, 9] == pytest.approx(field(fine_angles, np.full(13, 55.0)))
+
+    # Coarse nodes are kept and unflagged cells keep interpolated values,
+    # which differ from the exact field
+    np.testing.assert_array_equal(grid[::2, ::2], coarse)
+    assert grid[1, 1] == pytest.approx(0.25 * (coarse[0, 0] + coarse[1, 0] + coarse[0, 1] + coarse[1, 1]))
+    assert grid[0, 3] == pytest.approx(0.5 * (coarse[0, 1] + coarse[0, 2]))
+    assert grid[0, 3] != pytest.approx(field(fine_angles[0], fine_velocities[3]), rel=1e-3)
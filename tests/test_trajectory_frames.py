@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from simulation import ProjectileSimulator
+
+
+@pytest.fixture
+def sim():
+    sim = ProjectileSimulator()
+    sim.solver_settings['backend'] = 'auto'
+    return sim
+
+
+def test_frames_share_one_grid(sim):
+    u, theta = 40.0, 50.0
+    t, x_ideal, y_ideal, x_drag, y_drag = sim.trajectory_frames(u, theta, n_frames=45)
+    assert all(len(array) == 45 for array in (t, x_ideal, y_ideal, x_drag, y_drag))
+    np.testing.assert_allclose(np.diff(t), t[-1] / 44)
+
+    # Both trajectories are evaluated at the same times
+    t_ideal = 2 * u * np.sin(np.radians(theta)) / sim.g
+    np.testing.assert_allclose(x_ideal, u * np.cos(np.radians(theta)) * np.minimum(t, t_ideal))
+    result = sim.with_air_resistance(u, theta)
+    flying = t <= result.t[-1]
+    np.testing.assert_allclose(x_drag[flying], np.interp(t[flying], result.t, result.x))
+
+
+def test_landed_trajectory_stays_at_its_landing_point(sim):
+    u, theta = 60.0, 45.0
+    t, x_ideal, y_ideal, x_drag, y_drag = sim.trajectory_frames(u, theta)
+    result = sim.with_air_resistance(u, theta)
+
+    # Drag lands first; the grid runs to the ideal landing
+    t_ideal = 2 * u * np.sin(np.radians(theta)) / sim.g
+    assert result.t[-1] < t[-1] == pytest.approx(t_ideal)
+    landed = t >= result.t[-1]
+    assert landed.sum() > 1
+    np.testing.assert_allclose(x_drag[landed], result.x[-1])
+    assert np.all(y_drag[landed] == pytest.approx(0.0, abs=0.01))
+    assert x_ideal[-1] == pytest.approx(u**2 * np.sin(np.radians(2 * theta)) / sim.g)
+    assert y_ideal[-1] == 0.0
+
+    assert np.all(y_ideal >= 0)
+    assert np.all(y_drag >= 0)
+
+
+def test_passed_result_gives_the_same_frames(sim):
+    result = sim.with_air_resistance(30, 60, 0.2, 0.08)
+    solved = sim.trajectory_frames(30, 60, 0.2, 0.08)
+    reused = sim.trajectory_frames(30, 60, 0.2, 0.08, result=result)
+    for a, b in zip(solved, reused):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_without_drag_both_trajectories_are_ideal(sim):
+    t, x_ideal, y_ideal, x_drag, y_drag = sim.trajectory_frames(30, 45, drag=False, n_frames=20)
+    assert len(t) == 20
+    np.testing.assert_array_equal(x_drag, x_ideal)
+    np.testing.assert_array_equal(y_drag, y_ideal)
+    assert x_drag is not x_ideal
@@ -0,0 +1,63 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from simulation import ProjectileSimulator, TrajectoryResult
+
+
+def _result(dtype=np.float64):
+    t = np.array([0.0, 1.0, 2.0])
+    return TrajectoryResult.from_columns(
+        t, x=3 * t, y=np.array([0.0, 4.0, 1.0]), vx=np.full(3, 3.0),
+        vy=np.array([4.0, 0.0, -4.0]), mass=2.0, g=10.0, dtype=dtype)
+
+
+def test_columns_are_views_of_one_buffer():
+    result = _result()
+    assert result.data.shape == (3, len(TrajectoryResult.COLUMNS))
+    for name in TrajectoryResult.COLUMNS:
+        assert getattr(result, name).base is result.data
+
+    solved = ProjectileSimulator().with_air_resistance(30, 45)
+    assert solved.x.base is solved.data
+
+
+def test_float32_halves_memory():
+    assert _result(np.float32).data.nbytes * 2 == _result().data.nbytes
+    solved = ProjectileSimulator().with_air_resistance(30, 45, dtype=np.float32)
+    assert solved.data.dtype == np.float32
+
+
+def test_derived_quantities():
+    result = _result()
+    np.testing.assert_allclose(result.speed, [5.0, 3.0, 5.0])
+    # m * (v**2 / 2 + g * y) with m = 2, g = 10
+    np.testing.assert_allclose(result.energy, [25.0, 89.0, 45.0])
+    assert result.apex_index == 1
+    assert result.speed is result.speed
+
+
+def test_unpacks_like_the_old_tuple():
+    result = _result()
+    t, x, y = result
+    np.testing.assert_array_equal(t, result.t)
+    np.testing.assert_array_equal(x, result.x)
+    np.testing.assert_array_equal(y, result.y)
+    np.testing.assert_array_equal(result[1], result.x)
+    np.testing.assert_array_equal(result[-1], result.y)
+    assert len(result) == 3
+
+
+def test_pickle_round_trip():
+    result = _result()
+    result.speed  # a computed value travels with the result
+    result.exact = False
+
+    copy = pickle.loads(pickle.dumps(result))
+    np.testing.assert_array_equal(copy.data, result.data)
+    assert (copy.mass, copy.g, copy.exact) == (2.0, 10.0, False)
+    np.testing.assert_allclose(copy.energy, result.energy)
+    assert copy.x.base is copy.data
+    with pytest.raises(AttributeError):
+        copy.extra = 1
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zipfile
+
+import numpy as np
+
+
+class TrajectoryCache:
+    """Content-addressed on-disk store of solved trajectories
+
+    Each entry is a compressed .npz file named by a hash of every input
+    that affects the result, so it survives server restarts and can be
+    shared by several worker processes. Writes go to a temporary file
+    that is atomically renamed into place, so readers never see a partial
+    entry. Reads refresh the file's modification time, which drives LRU
+    eviction once the directory grows past max_bytes; entries older than
+    max_age seconds (if set) are dropped as well.
+    """
+
+    SUFFIX = '.npz'
+    STALE_TMP_SECONDS = 3600
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024**2,
+                 max_age: float = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(kind: str, **params) -> str:
+        """Stable hash of a result kind and its inputs"""
+        payload = json.dumps({'kind': kind, **params}, sort_keys=True, default=repr)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key: str):
+        """Cached tuple of arrays, or None on a miss or unreadable entry"""
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                arrays = tuple(data[f'arr_{i}'] for i in range(len(data.files)))
+            if self.max_age is not None and time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+            os.utime(path)
+        except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+            return None
+        return arrays
+
+    def put(self, key: str, arrays) -> None:
+        """Store a tuple of arrays under key, then enforce the size cap"""
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    np.savez_compressed(f, *arrays)
+                os.replace(tmp_path, self._path(key))
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        except OSError as e:
+            print(f"Trajectory cache write error: {e}")
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove expired entries, then least recently used ones over the cap"""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+                age = now - stat.st_mtime
+                if name.endswith('.tmp'):
+                    # Left behind by a writer that died mid-write
+                    if age > self.STALE_TMP_SECONDS:
+                        os.remove(path)
+                    continue
+                if not name.endswith(self.SUFFIX):
+                    continue
+                if self.max_age is not None and age > self.max_age:
+                    os.remove(path)
+                    continue
+            except FileNotFoundError:
+                # Another process evicted or replaced it first
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,76 @@
+import numpy as np
+
+
+def trajectory_metrics(t, x, y) -> dict:
+    """Range, maximum height and time of flight of a sampled trajectory"""
+    if len(x) == 0:
+        return {'range': 0.0, 'max_height': 0.0, 'flight_time': 0.0}
+    return {
+        'range': float(x[-1]),
+        'max_height': float(np.max(y)),
+        'flight_time': float(t[-1]),
+    }
+
+
+def coarse_grid(solve, angle_range=(15, 75), velocity_range=(10, 100),
+                coarse_shape=(7, 10)) -> tuple:
+    """Solve every point of a coarse angle x velocity grid
+
+    solve(theta_array, u_array) returns a dict of metric arrays. Returns
+    (angles, velocities, values, n_solved) where values maps each metric
+    to an array of shape (len(angles), len(velocities)).
+    """
+    angles = np.linspace(angle_range[0], angle_range[1], coarse_shape[0])
+    velocities = np.linspace(velocity_range[0], velocity_range[1], coarse_shape[1])
+    theta, u = np.meshgrid(angles, velocities, indexing='ij')
+    solved = solve(theta.ravel(), u.ravel())
+    values = {name: np.asarray(array).reshape(theta.shape) for name, array in solved.items()}
+    return angles, velocities, values, theta.size
+
+
+def refine_grid(solve, angles, velocities, values, tol: float = 0.05) -> tuple:
+    """Halve the grid spacing, solving only where the fields change quickly
+
+    values maps each metric to an array of shape (len(angles),
+    len(velocities)). New points are first filled by bilinear
+    interpolation; every coarse cell whose corner values spread by more
+    than tol of that metric's overall range is then re-solved exactly
+    with solve(theta_array, u_array), which returns all metrics at once.
+    Returns (angles, velocities, values, n_solved) for the refined grid.
+    """
+    n_a, n_v = next(iter(values.values())).shape
+    fine_angles = np.linspace(angles[0], angles[-1], 2 * n_a - 1)
+    fine_velocities = np.linspace(velocities[0], velocities[-1], 2 * n_v - 1)
+
+    fine = {}
+    flagged = np.zeros((n_a - 1, n_v - 1), dtype=bool)
+    for name, coarse in values.items():
+        grid = np.empty((2 * n_a - 1, 2 * n_v - 1))
+        grid[::2, ::2] = coarse
+        grid[1::2, ::2] = 0.5 * (coarse[:-1, :] + coarse[1:, :])
+        grid[::2, 1::2] = 0.5 * (coarse[:, :-1] + coarse[:, 1:])
+        grid[1::2, 1::2] = 0.25 * (coarse[:-1, :-1] + coarse[1:, :-1]
+                                   + coarse[:-1, 1:] + coarse[1:, 1:])
+        fine[name] = grid
+
+        corners = np.stack([coarse[:-1, :-1], coarse[1:, :-1],
+                            coarse[:-1, 1:], coarse[1:, 1:]])
+        spread = corners.max(axis=0) - corners.min(axis=0)
+        scale = max(float(coarse.max() - coarse.min()), 1e-12)
+        flagged |= spread > tol * scale
+
+    # Every new point touching a flagged cell gets an exact solve
+    needed = np.zeros((2 * n_a - 1, 2 * n_v - 1), dtype=bool)
+    for di in range(3):
+        for dj in range(3):
+            needed[di:di + 2 * (n_a - 1):2, dj:dj + 2 * (n_v - 1):2] |= flagged
+    needed[::2, ::2] = False
+
+    rows, cols = np.nonzero(needed)
+    if len(rows) > 0:
+        solved = solve(fine_angles[rows], fine_velocities[cols])
+        for name, grid in fine.items():
+            grid[rows, cols] = solved[name]
+
+    return fine_angles, fine_velocities, fine, len(rows)
+
@@ -0,0 +1,231 @@
+import numpy as np
+import plotly.graph_objects as go
+
+
+def create_animated_trajectory(t, x_ideal, y_ideal, x_drag, y_drag,
+                               planet_name: str, show_ideal: bool = True,
+                               drag_label: str = 'Realistic (With Drag)') -> go.Figure:
+    """Plotly figure with one animation frame per sample of the shared time grid
+
+    All frames are embedded in the figure, so playback, pausing and
+    scrubbing run in the browser without any Streamlit reruns.
+    """
+    n_frames = len(t)
+
+    # Fixed axes so the view does not jump while playing
+    x_max = max(float(np.max(x_ideal)), float(np.max(x_drag)), 1.0) * 1.05
+    y_max = max(float(np.max(y_ideal)), float(np.max(y_drag)), 1.0) * 1.15
+
+    def frame_traces(k):
+        traces = []
+        if show_ideal:
+            traces.append(go.Scatter(x=x_ideal[:k + 1], y=y_ideal[:k + 1]))
+            traces.append(go.Scatter(x=[x_ideal[k]], y=[y_ideal[k]]))
+        traces.append(go.Scatter(x=x_drag[:k + 1], y=y_drag[:k + 1]))
+        traces.append(go.Scatter(x=[x_drag[k]], y=[y_drag[k]]))
+        return traces
+
+    fig = go.Figure()
+
+    # Initial traces (frame 0) carry the styling; frames only update data
+    if show_ideal:
+        fig.add_trace(go.Scatter(
+            x=x_ideal[:1], y=y_ideal[:1],
+            mode='lines',
+            name='Ideal (No Drag)',
+            line=dict(color='#3B82F6', dash='dash', width=2),
+            hovertemplate='<b>Ideal Trajectory</b><br>Distance: %{x:.1f} m<br>Height: %{y:.1f} m<extra></extra>'
+        ))
+        fig.add_trace(go.Scatter(
+            x=x_ideal[:1], y=y_ideal[:1],
+            mode='markers',
+            showlegend=False,
+            marker=dict(size=12, color='#3B82F6'),
+            hoverinfo='skip'
+        ))
+    fig.add_trace(go.Scatter(
+        x=x_drag[:1], y=y_drag[:1],
+        mode='lines',
+        name=drag_label,
+        line=dict(color='#EF4444', width=3),
+        hovertemplate='<b>Realistic Trajectory</b><br>Distance: %{x:.1f} m<br>Height: %{y:.1f} m<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=x_drag[:1], y=y_drag[:1],
+        mode='markers',
+        showlegend=False,
+        marker=dict(size=14, color='#EF4444'),
+        hoverinfo='skip'
+    ))
+
+    fig.frames = [
+        go.Frame(data=frame_traces(k), name=str(k))
+        for k in range(n_frames)
+    ]
+
+    frame_ms = 50
+    play_args = dict(frame=dict(duration=frame_ms, redraw=False),
+                     transition=dict(duration=0),
+                     fromcurrent=True, mode='immediate')
+    pause_args = dict(frame=dict(duration=0, redraw=False),
+                      transition=dict(duration=0), mode='immediate')
+
+    fig.update_layout(
+        title=dict(
+            text=f"Projectile Trajectory on {planet_name}",
+            font=dict(size=24, color='#1F2937'),
+            x=0.5,
+            xanchor='center'
+        ),
+        xaxis=dict(
+            title="Horizontal Distance (m)",
+            title_font=dict(size=14),
+            range=[0, x_max],
+            autorange=False,
+            gridcolor='#E5E7EB',
+            zerolinecolor='#E5E7EB'
+        ),
+        yaxis=dict(
+            title="Vertical Height (m)",
+            title_font=dict(size=14),
+            range=[0, y_max],
+            autorange=False,
+            gridcolor='#E5E7EB',
+            zerolinecolor='#E5E7EB'
+        ),
+        height=550,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        legend=dict(
+            yanchor="top",
+            y=0.99,
+            xanchor="left",
+            x=0.02,
+            bgcolor='rgba(255, 255, 255, 0.9)',
+            bordercolor='#E5E7EB',
+            borderwidth=1
+        ),
+        margin=dict(l=50, r=30, t=80, b=110),
+        updatemenus=[dict(
+            type='buttons',
+            direction='left',
+            x=0.0, y=-0.12,
+            xanchor='left', yanchor='top',
+            showactive=False,
+            buttons=[
+                dict(label='▶ Play', method='animate', args=[None, play_args]),
+                dict(label='⏸ Pause', method='animate', args=[[None], pause_args]),
+            ]
+        )],
+        sliders=[dict(
+            active=0,
+            x=0.15, y=-0.08,
+            len=0.85,
+            currentvalue=dict(prefix='t = ', suffix=' s'),
+            steps=[
+                dict(label=f"{t[k]:.2f}", method='animate',
+                     args=[[str(k)], pause_args])
+                for k in range(n_frames)
+            ]
+        )]
+    )
+
+    return fig
+
+
+PLANET_COLORS = {
+    'earth': '#3B82F6',
+    'moon': '#9CA3AF',
+    'mars': '#EF4444',
+    'jupiter': '#F59E0B',
+}
+
+
+def create_comparison_figure(results: dict) -> go.Figure:
+    """Overlay the trajectories of one launch in several environments"""
+    fig = go.Figure()
+
+    for planet, (t, x, y) in results.items():
+        fig.add_trace(go.Scatter(
+            x=x, y=y,
+            mode='lines',
+            name=planet.title(),
+            line=dict(color=PLANET_COLORS.get(planet, '#1F2937'), width=3),
+            hovertemplate=f'<b>{planet.title()}</b><br>Distance: %{{x:.1f}} m<br>Height: %{{y:.1f}} m<extra></extra>'
+        ))
+
+    fig.update_layout(
+        title=dict(
+            text="Same Launch in Every Environment",
+            font=dict(size=20, color='#1F2937'),
+            x=0.5,
+            xanchor='center'
+        ),
+        xaxis=dict(
+            title="Horizontal Distance (m)",
+            title_font=dict(size=14),
+            gridcolor='#E5E7EB',
+            zerolinecolor='#E5E7EB'
+        ),
+        yaxis=dict(
+            title="Vertical Height (m)",
+            title_font=dict(size=14),
+            gridcolor='#E5E7EB',
+            zerolinecolor='#E5E7EB'
+        ),
+        height=450,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        legend=dict(
+            yanchor="top",
+            y=0.99,
+            xanchor="right",
+            x=0.98,
+            bgcolor='rgba(255, 255, 255, 0.9)',
+            bordercolor='#E5E7EB',
+            borderwidth=1
+        ),
+        margin=dict(l=50, r=30, t=60, b=50)
+    )
+
+    return fig
+
+
+def create_heatmap_figure(angles, velocities, values, metric_label: str,
+                          velocity: float = None, angle: float = None) -> go.Figure:
+    """Heatmap of a trajectory metric over launch velocity and angle"""
+    fig = go.Figure(go.Heatmap(
+        x=velocities, y=angles, z=values,
+        colorscale='Viridis',
+        colorbar=dict(title=metric_label),
+        hovertemplate=f'Velocity: %{{x:.1f}} m/s<br>Angle: %{{y:.1f}}°<br>{metric_label}: %{{z:.2f}}<extra></extra>'
+    ))
+
+    # Mark the launch currently selected in the sidebar
+    if velocity is not None and angle is not None:
+        fig.add_trace(go.Scatter(
+            x=[velocity], y=[angle],
+            mode='markers',
+            name='Current Launch',
+            marker=dict(size=14, color='white', symbol='x',
+                        line=dict(color='#1F2937', width=2)),
+            hovertemplate='<b>Current Launch</b><extra></extra>'
+        ))
+
+    fig.update_layout(
+        title=dict(
+            text=f"{metric_label} over Velocity × Angle",
+            font=dict(size=20, color='#1F2937'),
+            x=0.5,
+            xanchor='center'
+        ),
+        xaxis=dict(title="Velocity (m/s)", title_font=dict(size=14)),
+        yaxis=dict(title="Angle (°)", title_font=dict(size=14)),
+        height=500,
+        showlegend=False,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        margin=dict(l=50, r=30, t=60, b=50)
+    )
+
+    return fig
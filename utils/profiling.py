@@ -0,0 +1,231 @@
+import cProfile
+import io
+import json
+import logging
+import logging.handlers
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+LOG_FILE = 'rerun_profile.log'
+LOG_MAX_BYTES = 1024**2
+LOG_BACKUPS = 5
+MAX_DUMPS = 20
+
+_loggers = {}
+_lock = threading.Lock()
+_owners = {}
+_active = threading.local()
+
+
+def _profile_logger(log_dir: str) -> logging.Logger:
+    """JSON-lines logger for one directory, rotated by size"""
+    with _lock:
+        if log_dir not in _loggers:
+            os.makedirs(log_dir, exist_ok=True)
+            logger = logging.getLogger(f"projectile.profile.{os.path.abspath(log_dir)}")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            handler = logging.handlers.RotatingFileHandler(
+                os.path.join(log_dir, LOG_FILE), maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUPS, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            _loggers[log_dir] = logger
+        return _loggers[log_dir]
+
+
+class RerunProfiler:
+    """Wall-clock breakdown of one script rerun into named phases
+
+    phase(name) closes the running phase and opens the next, so phases
+    are marked with one call at each boundary; time spent under the same
+    name is summed. With memory=True each phase also records its
+    tracemalloc peak above the allocation level it started at, and with
+    cprofile=True the rerun runs under cProfile and the stats are dumped
+    next to the log (the newest MAX_DUMPS are kept). A disabled profiler
+    does nothing, so the calls can stay in the script.
+
+    The tracemalloc peak and, from Python 3.12, cProfile are process-wide,
+    so each is held by one rerun at a time; a rerun that finds either busy
+    runs without it and lists it under 'skipped' in the report. Peaks
+    still include allocations by other sessions' threads, so they are
+    reported as process_peak_kb.
+    """
+
+    def __init__(self, enabled: bool = False, memory: bool = False,
+                 cprofile: bool = False, log_dir: str = '.profile'):
+        self.enabled = enabled
+        self.memory = enabled and memory
+        self.cprofile = enabled and cprofile
+        self.log_dir = log_dir
+        self.times = {}
+        self.peaks = {}
+        self._phase = None
+        self._phase_start = 0.0
+        self._phase_base = 0
+        self._profile = None
+        self._started_tracemalloc = False
+        self._thread = threading.current_thread()
+        self.skipped = []
+        if not enabled:
+            return
+
+        # A rerun interrupted by Streamlit never reaches finish(); release
+        # what its profiler still holds on this thread
+        stale = getattr(_active, 'profiler', None)
+        if stale is not None:
+            stale._release()
+        _active.profiler = self
+
+        if self.memory:
+            if self._claim('memory'):
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._started_tracemalloc = True
+            else:
+                self.memory = False
+                self.skipped.append('memory')
+        if self.cprofile:
+            if self._claim('cprofile'):
+                try:
+                    profile = cProfile.Profile()
+                    profile.enable()
+                    self._profile = profile
+                except ValueError as e:
+                    # Another tool (a debugger, coverage) already profiles
+                    print(f"cProfile error: {e}")
+                    self._disown('cprofile')
+            if self._profile is None:
+                self.skipped.append('cprofile')
+
+    @classmethod
+    def from_setting(cls, setting: str, log_dir: str = '.profile') -> 'RerunProfiler':
+        """Profiler for a query parameter or environment value
+
+        Any of "1", "true", "on" enables phase timing; "memory" and
+        "cprofile" (comma separated, or "all" for both) enable the extras.
+        """
+        options = {option.strip().lower() for option in (setting or '').split(',')}
+        options.discard('')
+        if 'all' in options:
+            options |= {'memory', 'cprofile'}
+        enabled = bool(options & {'1', 'true', 'on', 'yes', 'memory', 'cprofile'})
+        return cls(enabled, memory='memory' in options, cprofile='cprofile' in options,
+                   log_dir=log_dir)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add time measured outside the profiler (e.g. before it existed)"""
+        if self.enabled:
+            self.times[name] = self.times.get(name, 0.0) + seconds
+
+    def phase(self, name: str) -> None:
+        """End the running phase and start timing the next one"""
+        if not self.enabled:
+            return
+        self._close_phase()
+        self._phase = name
+        if self.memory:
+            self._phase_base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._phase_start = time.perf_counter()
+
+    def _close_phase(self) -> None:
+        if self._phase is None:
+            return
+        self.record(self._phase, time.perf_counter() - self._phase_start)
+        if self.memory:
+            peak = tracemalloc.get_traced_memory()[1] - self._phase_base
+            self.peaks[self._phase] = max(self.peaks.get(self._phase, 0), peak)
+        self._phase = None
+
+    def _claim(self, resource: str) -> bool:
+        """Take a process-wide resource unless a live rerun holds it"""
+        with _lock:
+            owner = _owners.get(resource)
+            if owner is not None and owner._thread.is_alive():
+                return False
+            _owners[resource] = self
+        if owner is not None:
+            # Its script thread ended without reaching finish()
+            owner._release()
+        return True
+
+    def _disown(self, resource: str) -> None:
+        with _lock:
+            if _owners.get(resource) is self:
+                del _owners[resource]
+
+    def _release(self) -> None:
+        """Stop cProfile and tracemalloc and hand them to other reruns"""
+        if self._profile is not None:
+            self._profile.disable()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self.memory = False
+        for resource in ('memory', 'cprofile'):
+            self._disown(resource)
+        if getattr(_active, 'profiler', None) is self:
+            _active.profiler = None
+
+    def _dump_stats(self) -> str:
+        """Write the cProfile stats and prune old dumps; returns the path"""
+        os.makedirs(self.log_dir, exist_ok=True)
+        path = os.path.join(self.log_dir,
+                            f"rerun-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{threading.get_ident()}.prof")
+        self._profile.dump_stats(path)
+
+        dumps = sorted((os.path.join(self.log_dir, name) for name in os.listdir(self.log_dir)
+                        if name.endswith('.prof')), key=os.path.getmtime)
+        for old in dumps[:-MAX_DUMPS]:
+            try:
+                os.remove(old)
+            except FileNotFoundError:
+                pass
+        return path
+
+    def finish(self, **context) -> dict:
+        """Close the last phase, log the rerun and return the report
+
+        context (the simulation inputs, say) is logged with the timings.
+        """
+        if not self.enabled:
+            return {}
+        self._close_phase()
+        memory = self.memory
+        self._release()
+
+        total = sum(self.times.values())
+        report = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'total_ms': 1000 * total,
+            'phases': [
+                {'phase': name, 'time_ms': 1000 * seconds,
+                 'share': seconds / total if total > 0 else 0.0,
+                 **({'process_peak_kb': self.peaks.get(name, 0) / 1024} if memory else {})}
+                for name, seconds in self.times.items()
+            ],
+            'context': context,
+        }
+        if self.skipped:
+            report['skipped'] = self.skipped
+
+        if self._profile is not None:
+            try:
+                report['cprofile_dump'] = self._dump_stats()
+            except OSError as e:
+                print(f"Profile dump error: {e}")
+            stream = io.StringIO()
+            pstats.Stats(self._profile, stream=stream).sort_stats('cumulative').print_stats(15)
+            report['cprofile_top'] = stream.getvalue()
+
+        try:
+            _profile_logger(self.log_dir).info(json.dumps(
+                {key: value for key, value in report.items() if key != 'cprofile_top'},
+                default=str))
+        except OSError as e:
+            print(f"Profile log error: {e}")
+        return report